@@ -0,0 +1,323 @@
+# app_assets.py
+# Images and other static assets, prepared once and reused across reruns
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+import streamlit as st
+from PIL import Image
+
+from app_cache import CACHE_DIR, LRUCache, safe_name
+from app_perf import span
+
+LOGO_DIR = CACHE_DIR / "logos"
+LOGO_WIDTH = 100
+LOGO_TIMEOUT = 5
+
+# Domains whose logo failed are not retried until this many seconds pass
+LOGO_MISS_TTL = 6 * 3600
+
+# Chart backgrounds are decoded straight to the chart's pixel size
+# (app_render.CHART_FIGSIZE x CHART_DPI)
+BACKGROUND_SIZE = (1500, 750)
+
+# Streamlit serves ./static (next to the main script) at app/static when
+# server.enableStaticServing is on (.streamlit/config.toml). Only headless
+# runs (bench_app.py) point CYBERPUNK_STATIC_DIR elsewhere; nothing serves it.
+STATIC_DIR = Path(os.environ.get("CYBERPUNK_STATIC_DIR", Path(__file__).resolve().parent / "static"))
+STATIC_URL = "app/static"
+
+_logo_lru = LRUCache(max_entries=512, name="logos")
+_background_lru = LRUCache(max_entries=16, max_bytes=64 * 1024 * 1024, name="backgrounds")
+_background_files = {}
+_published = {}
+_logo_misses = {}
+_session = None
+_session_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# Pooled HTTP session
+# ----------------------------------------------------------------------
+def http_session():
+    """Process-wide requests.Session with a connection pool sized for the fetch stage."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests is only needed once something goes to the network
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# ----------------------------------------------------------------------
+# Company logos
+# ----------------------------------------------------------------------
+def get_logo_url(info: dict):
+    logo_url = info.get("logo_url")
+    if not logo_url:
+        domain = (info.get("website") or "").replace("https://", "").replace("http://", "").split("/")[0]
+        if domain:
+            logo_url = f"https://logo.clearbit.com/{domain}"
+    return logo_url
+
+
+def _logo_key(logo_url: str):
+    # clearbit URLs carry the company domain in the path; anything else by host
+    parsed = urlparse(logo_url)
+    if parsed.netloc == "logo.clearbit.com":
+        key = parsed.path.strip("/")
+    else:
+        key = parsed.netloc + parsed.path
+    return safe_name(key.lower())
+
+
+def make_thumbnail(data: bytes, width: int = LOGO_WIDTH):
+    """Decode an image once and re-encode it as a `width`-px PNG."""
+    img = Image.open(BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    if img.width > width:
+        img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+    out = BytesIO()
+    img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _is_recent_miss(key: str, now: float):
+    if now - _logo_misses.get(key, 0) < LOGO_MISS_TTL:
+        return True
+    marker = LOGO_DIR / f"{key}.miss"
+    try:
+        mtime = marker.stat().st_mtime
+    except OSError:
+        return False
+    _logo_misses[key] = mtime
+    return now - mtime < LOGO_MISS_TTL
+
+
+def _record_miss(key: str, now: float):
+    _logo_misses[key] = now
+    try:
+        LOGO_DIR.mkdir(parents=True, exist_ok=True)
+        (LOGO_DIR / f"{key}.miss").touch()
+    except Exception:
+        pass
+
+
+def get_logo(info: dict):
+    """
+    100px PNG thumbnail for the company in `info`, or None.
+
+    Lookups go memory LRU -> disk cache (by domain) -> network through the
+    pooled session; failed domains are remembered for LOGO_MISS_TTL.
+    """
+    logo_url = get_logo_url(info)
+    if not logo_url:
+        return None
+    key = _logo_key(logo_url)
+    thumb = _logo_lru.get(key)
+    if thumb is not None:
+        return thumb
+
+    path = LOGO_DIR / f"{key}.png"
+    try:
+        thumb = path.read_bytes()
+    except OSError:
+        thumb = None
+    if thumb:
+        _logo_lru.put(key, thumb)
+        return thumb
+
+    now = time.time()
+    if _is_recent_miss(key, now):
+        return None
+    try:
+        with span("provider:logo"):
+            r = http_session().get(logo_url, timeout=LOGO_TIMEOUT)
+        if r.status_code != 200:
+            raise ValueError(r.status_code)
+        thumb = make_thumbnail(r.content)
+    except Exception:
+        _record_miss(key, now)
+        return None
+
+    _logo_lru.put(key, thumb)
+    try:
+        LOGO_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(thumb)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+    return thumb
+
+
+# ----------------------------------------------------------------------
+# Chart backgrounds
+# ----------------------------------------------------------------------
+def decode_background(data: bytes, size=BACKGROUND_SIZE):
+    """Decode an image and resample it once to `size` -> read-only uint8 RGB array."""
+    img = Image.open(BytesIO(data))
+    img.draft("RGB", size)  # lets JPEG decode at a reduced scale
+    img = img.convert("RGB").resize(size, Image.BILINEAR)
+    arr = np.asarray(img)
+    arr.flags.writeable = False
+    return arr
+
+
+def background_from_bytes(data: bytes):
+    """(array, key) for image bytes, e.g. a user upload; shared by content hash."""
+    key = hashlib.sha1(data).hexdigest()
+    arr = _background_lru.get(key)
+    if arr is None:
+        arr = decode_background(data)
+        _background_lru.put(key, arr)
+    return arr, key
+
+
+def background_from_file(path):
+    """(array, key) for an image on disk; the file is only re-read when it changes."""
+    path = str(path)
+    mtime = os.stat(path).st_mtime
+    known = _background_files.get(path)
+    if known is not None and known[0] == mtime:
+        arr = _background_lru.get(known[1])
+        if arr is not None:
+            return arr, known[1]
+    with open(path, "rb") as fh:
+        arr, key = background_from_bytes(fh.read())
+    _background_files[path] = (mtime, key)
+    return arr, key
+
+
+# ----------------------------------------------------------------------
+# Static assets: splash and video served by URL, stylesheet inlined;
+# all prepared once per process
+# ----------------------------------------------------------------------
+def static_serving_enabled():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def publish_bytes(name: str, data: bytes):
+    """
+    Copy `data` into STATIC_DIR under a content-hashed name and return its URL.
+
+    The URL changes whenever the content does, so browsers can cache it
+    indefinitely. Older copies of the same asset are removed. `name` may
+    carry user input (a ticker), so it is sanitised first.
+    """
+    stem, suffix = os.path.splitext(safe_name(name))
+    digest = hashlib.sha1(data).hexdigest()[:12]
+    target = STATIC_DIR / f"{stem}.{digest}{suffix}"
+    if not target.exists():
+        STATIC_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        # exactly <stem>.<digest><suffix>: logo_BRK.*.png must not take logo_BRK.B's copy
+        previous = re.compile(re.escape(stem) + r"\.[0-9a-f]{12}" + re.escape(suffix))
+        for old in STATIC_DIR.glob(f"{stem}.*{suffix}"):
+            if old != target and previous.fullmatch(old.name):
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+    return f"{STATIC_URL}/{target.name}"
+
+
+def _memo(key, build):
+    # process-wide memo for prepared assets; keys include the source mtime
+    if key not in _published:
+        _published[key] = build()
+    return _published[key]
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def static_url(path):
+    """Content-hashed app/static URL for a local file, or None if it can't be served."""
+    mtime = _mtime(path)
+    if mtime is None or not static_serving_enabled():
+        return None
+
+    def build():
+        try:
+            return publish_bytes(Path(path).name, Path(path).read_bytes())
+        except Exception:
+            return None
+    return _memo(("static", str(path), mtime), build)
+
+
+def media_src(path):
+    """Static URL for an image/video, falling back to a (once-encoded) data URI."""
+    url = static_url(path)
+    if url or _mtime(path) is None:
+        return url
+
+    def build():
+        mime = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+        return f"data:{mime};base64,{base64.b64encode(Path(path).read_bytes()).decode()}"
+    return _memo(("data", str(path), _mtime(path)), build)
+
+
+def image_src(name: str, data: bytes):
+    """Static URL (or data URI) for in-memory image bytes, e.g. a logo thumbnail."""
+    def build():
+        if static_serving_enabled():
+            try:
+                return publish_bytes(name, data)
+            except Exception:
+                pass
+        mime = mimetypes.guess_type(name)[0] or "image/png"
+        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+    return _memo(("bytes", name, hashlib.sha1(data).hexdigest()), build)
+
+
+def minify_css(css: str):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def stylesheet_html(css_path, *blocks):
+    """
+    One <style> carrying the theme file plus any inline `blocks`, combined
+    and minified once per process.
+
+    Always inline: Streamlit's static server (Tornado handler, through at
+    least 1.53) sends anything but images, fonts, pdf, xml and json as
+    text/plain with nosniff, and browsers refuse such a stylesheet.
+    """
+    def build():
+        parts = [minify_css(b) for b in blocks]
+        try:
+            parts.append(minify_css(Path(css_path).read_text(encoding="utf-8")))
+        except Exception:
+            pass
+        return f"<style>{''.join(parts)}</style>"
+    return _memo(("css", str(css_path), _mtime(css_path), blocks), build)
@@ -0,0 +1,231 @@
+# app_cache.py
+# In-process caches shared by the data and asset layers. Named caches join
+# one process-wide byte budget and report hit / miss / eviction / byte stats.
+import functools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Root for everything persisted between restarts (histories, logos, ...)
+CACHE_DIR = Path(os.environ.get("CYBERPUNK_CACHE_DIR", ".cache"))
+
+# Ceiling for everything the named in-memory caches hold together
+MEMORY_BUDGET = int(os.environ.get("CYBERPUNK_CACHE_MB", "512")) * 1024 * 1024
+
+_MISSING = object()
+
+
+# ----------------------------------------------------------------------
+# Disk helpers shared by the per-ticker stores (history, indicators, info)
+# ----------------------------------------------------------------------
+def safe_name(key: str):
+    """`key` (a ticker symbol, ...) made safe to use as a file name."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+
+
+def read_feather(path, index: str = "Date"):
+    """Frame written by write_feather(), memory-mapped; None when missing or unreadable."""
+    import pyarrow.feather as feather  # only the stores that persist frames need pyarrow
+    try:
+        return feather.read_table(path, memory_map=True).to_pandas().set_index(index)
+    except Exception:
+        return None
+
+
+def write_feather(path, frame, index: str = "Date"):
+    """Store `frame` (index included) as uncompressed Feather, atomically; failures are ignored."""
+    import pyarrow.feather as feather
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        out = frame.copy()
+        out.index.name = index
+        feather.write_feather(out.reset_index(), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+def sizeof(value):
+    """Approximate in-memory size of a cached value, in bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    to_plotly_json = getattr(value, "to_plotly_json", None)
+    if callable(to_plotly_json):  # plotly Figure: the trace arrays sit in its JSON dict
+        try:
+            return sizeof(to_plotly_json())
+        except Exception:
+            pass
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):  # DataFrame
+        try:
+            return int(memory_usage(index=True).sum())
+        except Exception:
+            pass
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryBudget:
+    """Byte ceiling across caches; going over evicts from whichever cache is largest."""
+
+    def __init__(self, max_bytes: int = MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def register(self, cache):
+        with self._lock:
+            self._caches[cache.name] = cache
+
+    @property
+    def bytes(self):
+        return sum(c.bytes for c in list(self._caches.values()))
+
+    def enforce(self):
+        # caches call this after releasing their own lock, so only one cache
+        # lock is ever held at a time
+        with self._lock:
+            while self.bytes > self.max_bytes:
+                victim = max(self._caches.values(), key=lambda c: c.bytes)
+                if not victim.evict_one():
+                    break
+
+    def stats(self):
+        with self._lock:
+            caches = list(self._caches.values())
+        return {c.name: c.stats() for c in caches}
+
+
+memory_budget = MemoryBudget()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU bounded by entry count and, optionally, total bytes.
+
+    Entries may expire after `ttl` seconds. A cache created with a `name`
+    also counts against the process-wide memory_budget and shows up in
+    cache_stats().
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = None, ttl: float = None,
+                 name: str = None, budget: MemoryBudget = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self._budget = budget if budget is not None else (memory_budget if name else None)
+        if self._budget is not None:
+            self._budget.register(self)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                del self._data[key]
+                self.bytes -= entry[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, ttl: float = None):
+        size = sizeof(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, size, expires_at)
+            self.bytes += size
+            while len(self._data) > self.max_entries or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._pop_oldest()
+        if self._budget is not None:
+            self._budget.enforce()
+
+    def _pop_oldest(self):
+        _, (_, size, _) = self._data.popitem(last=False)
+        self.bytes -= size
+        self.evictions += 1
+
+    def evict_one(self):
+        with self._lock:
+            if not self._data:
+                return False
+            self._pop_oldest()
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._data), "bytes": self.bytes, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_ratio": round(self.hits / lookups, 4) if lookups else None}
+
+
+def cache_stats():
+    """{cache name: stats} for every named cache, plus the budget totals under "_budget"."""
+    stats = memory_budget.stats()
+    stats["_budget"] = {"bytes": memory_budget.bytes, "max_bytes": memory_budget.max_bytes}
+    return stats
+
+
+# Small provider results (live info, ...) that have no store of their own
+provider_cache = LRUCache(max_entries=4096, name="provider")
+
+
+def memoize(cache: LRUCache, ttl: float = None, key=None):
+    """
+    Cache a provider function's results in `cache`.
+
+    `key(*args, **kwargs)` returns what identifies a call; arguments that
+    don't change the result (API keys, sessions) should be left out of it so
+    every user shares one entry. Defaults to all arguments.
+    """
+    def deco(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ident = key(*args, **kwargs) if key is not None else (args, tuple(sorted(kwargs.items())))
+            cache_key = (func.__qualname__, ident)
+            value = cache.get(cache_key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.put(cache_key, value, ttl=ttl)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return deco
@@ -1,6 +1,7 @@
 import streamlit as st
 from pathlib import Path
-import base64
+
+from app_assets import media_src, stylesheet_html
 
 # -------------------------------------------------------
 # MUST BE FIRST STREAMLIT COMMAND
@@ -103,10 +104,8 @@ html, body, [data-testid="stAppViewContainer"], .stApp {
 # -------------------------------------------------------
 def splash_screen(image_path: str):
     try:
-        img_file = Path(image_path)
-        if img_file.exists():
-            data = img_file.read_bytes()
-            b64 = base64.b64encode(data).decode()
+        src = media_src(image_path)
+        if src:
             splash_html = f"""
             <style>
             @keyframes fadeout {{
@@ -129,7 +128,7 @@ def splash_screen(image_path: str):
             }}
             </style>
             <div id="splash-screen">
-                <img src="data:image/jpeg;base64,{b64}" style="max-width:70vw; max-height:70vh;">
+                <img src="{src}" style="max-width:70vw; max-height:70vh;">
             </div>
             """
             st.markdown(splash_html, unsafe_allow_html=True)
@@ -193,24 +192,18 @@ def run_app():
 
 
     import streamlit.components.v1 as components
-    import yfinance as yf
-    import requests
-    from io import BytesIO
-    from PIL import Image
-    import datetime
-    import time
-    import pandas as pd
-    import plotly.graph_objects as go
-
 
     # ------------------------------------------------------------------
     # Import rendering helpers from app_render.py (no circular imports)
     # ------------------------------------------------------------------
-    from app_render import (
-        render_company_header,
-        render_matplotlib_cyberpunk_chart,
-        render_plotly_fallback
-    )
+    from app_render import CHART_BACKENDS, render_overview_table
+    from app_indicators import INDICATORS
+    from app_assets import background_from_bytes, background_from_file, image_src
+    from app_data import fetch_watchlist
+    from app_history import get_history_store
+    from app_overview import build_overview
+    from app_live import lazy_section, live_card, live_chart, live_comparison, live_news, watch_quotes
+    from app_perf import panel_requested, render_perf_panel, span
 
     # ------------------------------------------------------------------
     # Helper: safe st.markdown wrapper to avoid accidental reassignment
@@ -221,8 +214,7 @@ def run_app():
     # ------------------------------------------------------------------
     # TRANSPARENCY + BASIC CSS (applied after page config)
     # ------------------------------------------------------------------
-    safe_markdown("""
-    <style>
+    transparency_css = """
     html, body, [data-testid="stBody"], [data-testid="stApp"],
     [data-testid="stAppViewContainer"], [data-testid="stMain"],
     section.main, .block-container { background: transparent !important; }
@@ -230,72 +222,59 @@ def run_app():
     .block-container { padding-top: 0rem !important; }
 
     .stApp > div[style] { position: relative; z-index: 1; }
-    </style>
-    """)
-
-    safe_markdown("""
-    <style>
-
-    /* Cyan labels + values (keep this) */
-    [data-testid="stMetricLabel"],
-    [data-testid="stMetricValue"] {
-        color: #00eaff !important;
-        text-shadow: 0 0 6px rgba(0, 234, 255, 0.8);
-    }
-
-    /* DAILY CHANGE DELTA FIX */
-    /* This targets the *actual* delta element you sent */
-    .st-emotion-cache-1wivap2.e14qm3311 {
-        text-shadow: none !important;
-    }
-
-    /* Positive → green */
-    .st-emotion-cache-1wivap2.e14qm3311[style*='color: green'],
-    .st-emotion-cache-1wivap2.e14qm3311 span[style*='color: green'] {
-        color: green !important;
-    }
 
-    /* Negative → red */
-    .st-emotion-cache-1wivap2.e14qm3311[style*='color: red'],
-    .st-emotion-cache-1wivap2.e14qm3311 span[style*='color: red'] {
-        color: red !important;
-    }
-
-    </style>
-    """)
+    .plotly-graph-div, .js-plotly-plot svg, .js-plotly-plot .svg-container { background: transparent !important; }
+    """
+
+    # Ticker cards are plain HTML (app_render.card_html); same look as st.metric
+    card_css = """
+    .cp-card { margin-bottom: 0.5rem; }
+    .cp-head { display: flex; align-items: center; gap: 1.5rem; margin-bottom: 0.75rem; }
+    .cp-head h3 { margin: 0; padding: 0; }
+    .cp-logo { width: 100px; height: auto; }
+    .cp-sub { opacity: 0.7; font-size: 0.875rem; }
+    .cp-metrics { display: grid; grid-template-columns: repeat(2, minmax(0, 1fr)); gap: 1rem; }
+    .cp-metric-label { color: #00eaff; font-size: 0.875rem; text-shadow: 0 0 6px rgba(0, 234, 255, 0.8); }
+    .cp-metric-value { color: #00eaff; font-size: 2.25rem; line-height: 1.2; text-shadow: 0 0 6px rgba(0, 234, 255, 0.8); }
+    .cp-delta { font-size: 0.875rem; }
+    .cp-up { color: green; }
+    .cp-down { color: red; }
+    hr.cp-sep { border: 1px solid #00f5ff; opacity: 0.3; }
+    """
 
     # ------------------------------------------------------------------
     # Load external cyberpunk CSS if available, otherwise use a minimal fallback
     # ------------------------------------------------------------------
+    fallback_css = """
+    @import url('https://fonts.googleapis.com/css2?family=Major+Mono+Display&display=swap');
+    .cyberpunk-title { font-family: 'Major Mono Display', monospace; font-size:58px; color:#00eaff; text-align:center; letter-spacing:2px; text-shadow:0 0 8px rgba(0,234,255,0.9),0 0 18px rgba(0,128,170,0.25); position:relative; top:-25px; margin-bottom:6px; }
+    .news-card { background: rgba(0,0,0,0.35); padding:8px; border-radius:8px; margin-bottom:8px; }
+    .card { background: linear-gradient(180deg, rgba(0,0,0,0.45), rgba(0,0,0,0.25)); border-radius:10px; padding:12px; border:1px solid rgba(0,234,255,0.08); }
+    """
+
+    # All of the above plus the theme file go out as one minified inline
+    # stylesheet, built once per process
     css_path = Path("cyberpunk_style_embedded.css")
     if css_path.exists():
-        try:
-            with css_path.open("r", encoding="utf-8") as fh:
-                safe_markdown(f"<style>{fh.read()}</style>")
-        except Exception:
-            # fail silently; fallback provided below
-            pass
+        safe_markdown(stylesheet_html(css_path, transparency_css, card_css))
     else:
-        safe_markdown("""
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Major+Mono+Display&display=swap');
-        .cyberpunk-title { font-family: 'Major Mono Display', monospace; font-size:58px; color:#00eaff; text-align:center; letter-spacing:2px; text-shadow:0 0 8px rgba(0,234,255,0.9),0 0 18px rgba(0,128,170,0.25); position:relative; top:-25px; margin-bottom:6px; }
-        .news-card { background: rgba(0,0,0,0.35); padding:8px; border-radius:8px; margin-bottom:8px; }
-        .card { background: linear-gradient(180deg, rgba(0,0,0,0.45), rgba(0,0,0,0.25)); border-radius:10px; padding:12px; border:1px solid rgba(0,234,255,0.08); }
-        </style>
-        """)
+        # @import has to lead the stylesheet
+        safe_markdown(stylesheet_html(css_path, fallback_css, transparency_css, card_css))
 
     # ------------------------------------------------------------------
     # VIDEO BACKGROUND: try local file first, then fallback to GitHub URL
     # ------------------------------------------------------------------
+    github_video_url = "https://github.com/eviltosh/final_cyberpunk_quotes_redux_V4/releases/download/v1.0/cyberpunk_light.mp4"
+
     def try_embed_local_video(path: Path) -> bool:
+        # served from app/static by content-hashed URL; GitHub copy as a second source
         try:
-            if path.exists():
-                data = path.read_bytes()
-                b64 = base64.b64encode(data).decode()
+            src = media_src(path)
+            if src:
                 safe_markdown(f"""
                 <video autoplay muted loop playsinline style="position:fixed;top:0;left:0;width:100vw;height:100vh;object-fit:cover;z-index:-1;">
-                    <source src="data:video/mp4;base64,{b64}" type="video/mp4">
+                    <source src="{src}" type="video/mp4">
+                    <source src="{github_video_url}" type="video/mp4">
                 </video>
                 """)
                 return True
@@ -306,9 +285,9 @@ def run_app():
     video_embedded = try_embed_local_video(Path("videos/cyberpunk_light.mp4"))
     if not video_embedded:
         # GitHub release fallback; use components.html to avoid large markup inside st.markdown
-        components.html("""
+        components.html(f"""
         <video autoplay loop muted playsinline style="position:fixed;top:0;left:0;width:100vw;height:100vh;object-fit:cover;z-index:-1;">
-            <source src="https://github.com/eviltosh/final_cyberpunk_quotes_redux_V4/releases/download/v1.0/cyberpunk_light.mp4" type="video/mp4">
+            <source src="{github_video_url}" type="video/mp4">
         </video>
         """, height=0, width=0)
 
@@ -316,32 +295,45 @@ def run_app():
     # Sidebar controls
     # ------------------------------------------------------------------
     st.sidebar.header("⚙️ Controls")
-    tickers_input = st.sidebar.text_input("Enter stock tickers (comma-separated):", "AAPL, TSLA, NVDA")
-    period = st.sidebar.selectbox("Select time range:", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"])
+    tickers_input = st.sidebar.text_input("Enter stock tickers (comma-separated):", "AAPL, TSLA, NVDA", key="tickers")
+    period = st.sidebar.selectbox("Select time range:", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"], key="period")
     refresh_rate = st.sidebar.slider("Auto-refresh interval (seconds):", 10, 300, 60)
+    layout = st.sidebar.radio("Layout:", ["Cards", "Overview", "Compare"], horizontal=True)
+    if layout == "Compare":
+        compare_style = st.sidebar.radio("Compare as:", ["Overlay", "Grid"], horizontal=True)
+    else:
+        compare_style = "Overlay"
+    page_size = st.sidebar.selectbox("Cards per page:", [5, 10, 20, 50], index=1, key="page_size")
 
     st.sidebar.subheader("🔑 API Keys")
-    finnhub_api = st.sidebar.text_input("Finnhub API key", value="", type="password")
+    finnhub_api = st.sidebar.text_input("Finnhub API key", value="", type="password", key="finnhub_key")
+
+    perf_slot = st.sidebar.container() if panel_requested() else None
 
     st.sidebar.subheader("🌅 Chart Background")
+    # only the selected engine's plotting library is ever imported
+    chart_engine = st.sidebar.selectbox("Chart engine:", list(CHART_BACKENDS), key="chart_backend")
+    indicators = st.sidebar.multiselect("Indicators:", list(INDICATORS), default=[], key="indicators")
     bg_choice = st.sidebar.selectbox("Select Background Image:", ["Beach 1", "Beach 2", "Classic", "Upload Your Own"])
     uploaded_bg = None
     if bg_choice == "Upload Your Own":
         uploaded_bg = st.sidebar.file_uploader("Upload a background image", type=["jpg", "jpeg", "png"])
 
+    # Backgrounds are decoded once per content hash (shared by all tickers and
+    # sessions); bg_key identifies the background for the rendered-chart cache
     bg_image = None
+    bg_key = None
     if uploaded_bg is not None:
         try:
-            from PIL import Image as PILImage
-            bg_image = PILImage.open(uploaded_bg)
+            bg_image, bg_key = background_from_bytes(uploaded_bg.getvalue())
         except Exception:
             bg_image = None
     else:
         try:
             if bg_choice == "Beach 1":
-                bg_image = Image.open("images/1.jpg")
+                bg_image, bg_key = background_from_file("images/1.jpg")
             elif bg_choice == "Beach 2":
-                bg_image = Image.open("images/2.jpg")
+                bg_image, bg_key = background_from_file("images/2.jpg")
             else:
                 bg_image = None
         except Exception:
@@ -359,141 +351,93 @@ def run_app():
     """)
 
     # ------------------------------------------------------------------
-    # Tickers list and auto-refresh
+    # Tickers list (auto-refresh is timer-driven per fragment, see app_live.py)
     # ------------------------------------------------------------------
     tickers = [t.strip().upper() for t in tickers_input.split(",") if t.strip()]
 
-    if "last_refresh" not in st.session_state:
-        st.session_state["last_refresh"] = time.time()
+    # ------------------------------------------------------------------
+    # Overview mode: one vectorized table for the whole watchlist; full
+    # cards only for the rows the user selects
+    # ------------------------------------------------------------------
+    if layout == "Overview":
+        with span("stage:overview"):
+            overview = build_overview(get_history_store().get_many(tickers))
+        card_tickers = render_overview_table(overview)
+        if not card_tickers:
+            st.caption("Select rows to open their full cards.")
+    elif layout == "Compare":
+        # the whole watchlist rebased in one figure; the cards below skip
+        # their own charts
+        with span("stage:compare"):
+            live_comparison(tickers, period, bg_image, bg_key, chart_engine, grid=compare_style == "Grid")
+        card_tickers = tickers
     else:
-        if time.time() - st.session_state["last_refresh"] > refresh_rate:
-            st.session_state["last_refresh"] = time.time()
-            st.rerun()
+        card_tickers = tickers
 
     # ------------------------------------------------------------------
-    # Cached helpers
+    # Pagination: only the current page of cards is fetched and rendered
     # ------------------------------------------------------------------
-    @st.cache_data(ttl=3600)
-    def get_stock_data(ticker: str, period: str):
-        try:
-            return yf.Ticker(ticker).history(period=period)
-        except Exception:
-            return pd.DataFrame()
+    n_pages = max(1, -(-len(card_tickers) // page_size))
+    if n_pages > 1:
+        page = st.sidebar.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1,
+                                       key="page")
+        start = (int(page) - 1) * page_size
+        st.caption(f"Showing {start + 1}–{min(start + page_size, len(card_tickers))} of {len(card_tickers)} tickers")
+        card_tickers = card_tickers[start:start + page_size]
 
-    @st.cache_data(ttl=3600)
-    def get_info_cached(ticker: str):
-        try:
-            return yf.Ticker(ticker).get_info()
-        except Exception:
-            return {}
-
-    @st.cache_data(ttl=1800)
-    def get_company_news(symbol: str, api_key: str):
-        if not api_key:
-            return []
-        FINNHUB_NEWS_URL = "https://finnhub.io/api/v1/company-news"
-        today = datetime.date.today()
-        past = today - datetime.timedelta(days=30)
-        params = {"symbol": symbol, "from": past.isoformat(), "to": today.isoformat(), "token": api_key}
-        try:
-            response = requests.get(FINNHUB_NEWS_URL, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return [item for item in data if item.get("headline") and item.get("url")]
-        except Exception:
-            pass
-        return []
+    # ------------------------------------------------------------------
+    # Fetch stage: batched history + pooled info/news/logos, before rendering
+    # ------------------------------------------------------------------
+    watch_quotes(card_tickers, refresh_rate)
+    with st.spinner("Fetching market data..."), span("stage:fetch_watchlist"):
+        watchlist = fetch_watchlist(card_tickers, period, finnhub_api, include_news=False)
 
     # ------------------------------------------------------------------
-    # Main loop: iterate tickers and render sections
+    # Main loop: one HTML block per card (header, metrics, separator), plus
+    # the lazy chart / company info / news sections
     # ------------------------------------------------------------------
-    for ticker in tickers:
+    if watchlist and not finnhub_api:
+        st.info("Enter your Finnhub API key in the sidebar to enable company news.")
+
+    for i, (ticker, data) in enumerate(watchlist.items()):
         try:
-            info = get_info_cached(ticker)
-            hist = get_stock_data(ticker, period)
+            info = data["info"]
+            hist = data["hist"]
 
             if hist is None or hist.empty:
                 st.warning(f"No data available for {ticker}")
                 continue
 
-            # Render company header
-            render_company_header(info, ticker)
-
-            # Try matplotlib cyberpunk chart first
-            rendered = render_matplotlib_cyberpunk_chart(hist, ticker, bg_image)
-            if not rendered:
-                render_plotly_fallback(hist, ticker)
-
-            # Metrics row
-            # ----------------------------------------------------------
-            # METRICS (2 on top row, 2 on bottom row — only change)
-            # ----------------------------------------------------------
-
-            # Top row: Price, Market Cap
-            row1 = st.columns(2)
+            # Header + metrics: the only block on the auto-refresh interval
+            with span("stage:card"):
+                logo_src = image_src(f"logo_{ticker}.png", data["logo"]) if data["logo"] else None
+                live_card(ticker, info, data["change"], refresh_rate, logo_src, separator=i > 0)
 
-            # Bottom row: 52w Range, Daily Change
-            row2 = st.columns(2)
-
-            c_price, c_cap = row1[0], row1[1]
-            c_range, c_change = row2[0], row2[1]
-
-            price = info.get("currentPrice") or info.get("regularMarketPrice")
-            cap = info.get("marketCap")
-            high = info.get("fiftyTwoWeekHigh")
-            low = info.get("fiftyTwoWeekLow")
-
-            with c_price:
-                st.metric("Current Price", f"${price:,.2f}" if price else "N/A")
-
-            with c_cap:
-                st.metric("Market Cap", f"${cap:,.0f}" if cap else "N/A")
-
-            with c_range:
-                st.metric("52w High / Low", f"${high} / ${low}")
-
-            with c_change:
-                hist_5d = get_stock_data(ticker, "5d")
-                if hist_5d is not None and len(hist_5d) >= 2:
-                    change = (
-                            hist_5d["Close"].iloc[-1]
-                            - hist_5d["Close"].iloc[-2]
-                    )
-                    pct = (change / hist_5d["Close"].iloc[-2]) * 100
-                    st.metric(
-                        "Daily Change",
-                        f"${change:.2f}",
-                        f"{pct:.2f}%"
-                    )
+            # Chart (refreshes on its own, slower schedule); collapsing it
+            # skips the history read and the render entirely. The Compare
+            # layout's shared figure stands in for it.
+            if layout != "Compare":
+                chart_box, chart_open = lazy_section(f"📈 {ticker} Chart", key=f"chart_open_{ticker}", expanded=True)
+                if chart_open:
+                    with chart_box, span("stage:chart"):
+                        live_chart(ticker, period, bg_image, bg_key, chart_engine, indicators)
 
             # Company info
             summary = info.get("longBusinessSummary", "No company description available.")
             if summary and summary.strip():
-                with st.expander("📘 Company Info (click to expand)"):
-                    st.write(summary)
+                info_box, info_open = lazy_section("📘 Company Info (click to expand)", key=f"info_open_{ticker}")
+                if info_open:
+                    with info_box, span("stage:company_info"):
+                        st.write(summary)
             else:
                 st.info("No company description available.")
 
-            st.markdown("---")
-
-            # News
-            st.subheader(f"📰 {ticker} Recent News")
-            if not finnhub_api:
-                st.info("Enter your Finnhub API key in the sidebar to enable company news.")
-                news = []
-            else:
-                news = get_company_news(ticker, finnhub_api)
-            if news:
-                for article in news[:5]:
-                    dt = datetime.datetime.fromtimestamp(article.get("datetime", 0))
-                    t_str = dt.strftime("%b %d, %Y")
-                    safe_markdown(
-                        f"<div class='news-card'><a href='{article.get('url')}' target='_blank'><b>{article.get('headline')}</b></a><br><small>{article.get('source', 'Unknown')} | {t_str}</small></div>")
-            else:
-                if finnhub_api:
-                    st.info("No recent news available.")
-
-            safe_markdown("<hr style='border: 1px solid #00f5ff; opacity: 0.3;'>")
+            # News (fetched the first time the section is opened)
+            if finnhub_api:
+                news_box, news_open = lazy_section(f"📰 {ticker} Recent News", key=f"news_open_{ticker}")
+                if news_open:
+                    with news_box, span("stage:news"):
+                        live_news(ticker, finnhub_api)
 
         except Exception as e:
             st.error(f"Could not load info for {ticker}: {e}")
@@ -502,6 +446,10 @@ def run_app():
     safe_markdown("<hr>")
     safe_markdown("Built with ❤️ — Wizard Q")
 
+    # Hidden diagnostics panel (?perf=1); drawn last so it includes this run
+    if perf_slot is not None:
+        render_perf_panel(perf_slot)
+
 # run
 if __name__ == "__main__":
     run_app()
@@ -0,0 +1,140 @@
+# app_data.py
+# Data providers + the watchlist fetch stage used by app_core.run_app()
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app_assets import get_logo
+from app_cache import memoize, provider_cache
+from app_history import daily_change, get_history_store, slice_period
+from app_info import LIVE_INFO_TTL, download_live_info, get_info_store
+from app_news import get_news_client
+from app_shared import get_shared_cache
+from app_poller import get_quote_poller
+
+# Upper bound on concurrent per-symbol calls (info, news, logos)
+MAX_FETCH_WORKERS = 8
+
+
+# ----------------------------------------------------------------------
+# Providers
+# ----------------------------------------------------------------------
+@memoize(provider_cache, ttl=LIVE_INFO_TTL, key=lambda ticker: ticker.upper())
+def get_live_info(ticker: str):
+    def fetch():
+        try:
+            return download_live_info(ticker) or None
+        except Exception:
+            return None
+    return get_shared_cache().get_or_fetch("live_info", ticker.upper(), fetch, LIVE_INFO_TTL) or {}
+
+
+def get_live_quote(ticker: str):
+    """Latest quote from the process-wide poller snapshot ({} until it is first polled)."""
+    return get_quote_poller().get(ticker)
+
+
+def get_card_info(ticker: str):
+    """
+    Static info (day-old at most, from disk) overlaid with live price / market cap.
+
+    The poller's snapshot already carries the price, so fast_info is only
+    asked until the first poll for the ticker lands.
+    """
+    info = dict(get_info_store().get(ticker))
+    quote = get_live_quote(ticker)
+    if quote.get("price"):
+        info["currentPrice"] = quote["price"]
+        if info.get("sharesOutstanding"):
+            info["marketCap"] = quote["price"] * info["sharesOutstanding"]
+    else:
+        info.update(get_live_info(ticker))
+    return info
+
+
+def get_company_news(symbol: str, api_key: str):
+    """Recent Finnhub articles for symbol (see app_news.NewsClient)."""
+    return get_news_client().get_news(symbol, api_key)
+
+
+# ----------------------------------------------------------------------
+# Fetch stage: everything the render loop needs, gathered up front
+# ----------------------------------------------------------------------
+def _script_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except Exception:
+        return None
+
+
+def _attach_ctx(ctx):
+    # Worker threads need the session's script context so st.cache_resource
+    # behaves exactly as it does on the main script thread.
+    if ctx is None:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    except Exception:
+        pass
+
+
+def _fetch_info_and_logo(ticker: str):
+    info = get_card_info(ticker)
+    return info, get_logo(info)
+
+
+def _empty_result():
+    return {"info": {}, "full_hist": pd.DataFrame(), "hist": pd.DataFrame(), "change": None,
+            "news": [], "logo": None}
+
+
+def fetch_watchlist(tickers, period: str, api_key: str = "", max_workers: int = MAX_FETCH_WORKERS,
+                    include_news: bool = True):
+    """
+    Fetch history, info, news and logos for the whole watchlist.
+
+    History comes from the shared HistoryStore (disk cache plus one batched
+    delta download for whatever is stale, sliced to `period` here); the
+    per-symbol calls fan out on a bounded thread pool, so the wall time
+    follows the slowest symbol rather than the sum of all of them. Returns
+    {ticker: result} with the keys of _empty_result(), in watchlist order.
+    With include_news=False news is left to the cards that open it.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    results = {t: _empty_result() for t in tickers}
+    if not tickers:
+        return results
+
+    ctx = _script_ctx()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=_attach_ctx,
+                            initargs=(ctx,)) as pool:
+        hist_future = pool.submit(get_history_store().get_many, tickers)
+        info_futures = {t: pool.submit(_fetch_info_and_logo, t) for t in tickers}
+        news = get_news_client()
+        news_futures = {t: pool.submit(news.get_news, t, api_key) for t in tickers} if api_key and include_news else {}
+
+        try:
+            frames = hist_future.result()
+        except Exception:
+            frames = {}
+        for t, frame in frames.items():
+            results[t]["full_hist"] = frame
+            results[t]["hist"] = slice_period(frame, period)
+            results[t]["change"] = daily_change(frame)
+
+        for t, future in info_futures.items():
+            try:
+                results[t]["info"], results[t]["logo"] = future.result()
+            except Exception:
+                pass
+
+        for t, future in news_futures.items():
+            try:
+                results[t]["news"] = future.result() or []
+            except Exception:
+                pass
+
+    return results
@@ -0,0 +1,76 @@
+# app_downsample.py
+# Shape-preserving decimation shared by the chart backends: a long series is
+# reduced to a pixel-proportional point budget with largest-triangle-three-
+# buckets (LTTB), always keeping the global min/max.
+import numpy as np
+
+# Drawing more than one point per couple of pixels adds nothing visible
+POINTS_PER_PIXEL = 0.5
+MIN_POINTS = 100
+
+
+def point_budget(width_px: int, points_per_pixel: float = POINTS_PER_PIXEL):
+    return max(MIN_POINTS, int(width_px * points_per_pixel))
+
+
+def lttb_indices(x, y, n_out: int):
+    """Indices of the points LTTB keeps when reducing (x, y) to about n_out points."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    # n - 2 inner points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        # next bucket's average point (or the last point for the final bucket)
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        if nhi <= nlo:
+            nlo, nhi = n - 1, n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # pick the point forming the largest triangle with the previous pick and that average
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_indices(x, y, n_out: int):
+    """LTTB indices plus the global extremes, sorted and unique."""
+    y = np.asarray(y, dtype=np.float64)
+    if n_out >= len(y):
+        return np.arange(len(y))
+    idx = lttb_indices(x, y, n_out)
+    extremes = [int(np.nanargmin(y)), int(np.nanargmax(y))]
+    return np.unique(np.concatenate([idx, extremes]))
+
+
+def downsample_history(hist, width_px: int, column: str = "Close"):
+    """`hist` reduced to the point budget for a chart `width_px` wide (rows, not resampled)."""
+    n_out = point_budget(width_px)
+    if hist is None or len(hist) <= n_out:
+        return hist
+    x = hist.index.asi8 if hasattr(hist.index, "asi8") else np.arange(len(hist))
+    return hist.iloc[downsample_indices(x, hist[column].to_numpy(), n_out)]
+
+
+def downsample_matrix(wide, width_px: int):
+    """
+    Rows of a dates x series frame kept for a chart `width_px` wide: the union
+    of each column's LTTB picks, the budget split across the columns.
+    """
+    n_out = point_budget(width_px)
+    if wide is None or len(wide) <= n_out or not len(wide.columns):
+        return wide
+    x = wide.index.asi8 if hasattr(wide.index, "asi8") else np.arange(len(wide))
+    per_column = max(MIN_POINTS, n_out // len(wide.columns))
+    # leading gaps (a series that starts later) would stall LTTB on NaN areas
+    values = wide.bfill().to_numpy(dtype=np.float64)
+    picks = [downsample_indices(x, values[:, j], per_column)
+             for j in range(values.shape[1]) if not np.isnan(values[:, j]).all()]
+    return wide.iloc[np.unique(np.concatenate(picks))] if picks else wide
@@ -0,0 +1,271 @@
+# app_history.py
+# Daily OHLCV history: one full history per ticker, persisted to disk as
+# uncompressed Feather (memory-mappable) and topped up with delta downloads.
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from app_cache import CACHE_DIR, LRUCache, read_feather, safe_name, write_feather
+from app_perf import timed
+from app_shared import get_shared_cache
+
+HISTORY_DIR = CACHE_DIR / "history"
+
+# How long a stored history counts as current before a delta refresh
+HISTORY_TTL = 3600
+
+# A failed download is retried after this long rather than on every rerun
+HISTORY_RETRY = 300
+
+# Histories kept in memory at once (bytes are bounded by app_cache.MEMORY_BUDGET)
+HISTORY_MAX_ENTRIES = 1024
+
+# Relative tolerance when re-checking an already stored close; anything
+# larger means the adjusted series changed (split/dividend) -> full reload
+ADJUSTMENT_RTOL = 1e-3
+
+# Every selectable period is a slice of the full history
+PERIOD_OFFSETS = {
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "max": None,
+}
+
+
+# ----------------------------------------------------------------------
+# Provider
+# ----------------------------------------------------------------------
+@timed("provider:history_download")
+def download_history(tickers, period: str = "max", start=None):
+    """Download history for every ticker in one yfinance call -> {ticker: DataFrame}."""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    # yfinance (and its scraping stack) costs ~0.25s to import; only on first download
+    import yfinance as yf
+    try:
+        if start is not None:
+            data = yf.download(tickers, start=start, group_by="ticker",
+                               auto_adjust=True, threads=True, progress=False)
+        else:
+            data = yf.download(tickers, period=period, group_by="ticker",
+                               auto_adjust=True, threads=True, progress=False)
+    except Exception:
+        return {}
+    return _split_download(data, tickers)
+
+
+def _split_download(data, tickers):
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for t in tickers:
+            if t in available:
+                frame = data[t].dropna(how="all")
+                if not frame.empty:
+                    frames[t] = frame
+    elif len(tickers) == 1:
+        frames[tickers[0]] = data.dropna(how="all")
+    return frames
+
+
+# ----------------------------------------------------------------------
+# Disk cache
+# ----------------------------------------------------------------------
+def _history_path(ticker: str):
+    return HISTORY_DIR / f"{safe_name(ticker)}.feather"
+
+
+def load_history(ticker: str):
+    """(frame, mtime) from the disk cache, or (None, 0) when nothing usable is stored."""
+    path = _history_path(ticker)
+    frame = read_feather(path)
+    try:
+        return (frame, path.stat().st_mtime) if frame is not None else (None, 0)
+    except OSError:
+        return None, 0
+
+
+def save_history(ticker: str, frame):
+    write_feather(_history_path(ticker), frame)
+
+
+
+def merge_delta(stored, delta):
+    """Append newly downloaded bars; re-downloaded dates replace the stored rows."""
+    if delta is None or delta.empty:
+        return stored
+    if stored is None or stored.empty:
+        return delta
+    merged = pd.concat([stored[~stored.index.isin(delta.index)], delta])
+    return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+
+def _adjustment_changed(stored, delta):
+    # The delta request starts one bar before the last stored one, so that bar
+    # is complete on both sides and must match unless the series was re-adjusted.
+    if len(stored) < 2 or delta is None or delta.empty:
+        return False
+    check = stored.index[-2]
+    if check not in delta.index:
+        return False
+    old, new = stored.at[check, "Close"], delta.at[check, "Close"]
+    return bool(old) and abs(new - old) > ADJUSTMENT_RTOL * abs(old)
+
+
+# ----------------------------------------------------------------------
+# History store: one full history per ticker, every period served by slicing
+# ----------------------------------------------------------------------
+class HistoryStore:
+    def __init__(self, ttl: int = HISTORY_TTL, max_entries: int = HISTORY_MAX_ENTRIES, retry: int = HISTORY_RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        # (frame, fetched_at) per ticker under the shared memory budget; an
+        # evicted frame is just memory-mapped back in from disk
+        self._entries = LRUCache(max_entries=max_entries, name="history")
+        # guards lookups and the in-flight table, never a download
+        self._lock = threading.Lock()
+        self._inflight = {}  # ticker -> Event set when its download finishes
+
+    def _lookup(self, tickers):
+        found = {}
+        for t in tickers:
+            entry = self._entries.get(t)
+            if entry is None:
+                frame, mtime = load_history(t)
+                if frame is None:
+                    continue
+                entry = (frame, mtime)
+                self._entries.put(t, entry)
+            found[t] = entry
+        return found
+
+    def _store(self, frames, ticker, frame, fetched_at):
+        frames[ticker] = frame
+        self._entries.put(ticker, (frame, fetched_at))
+
+    def _retry_later(self, frames, ticker, now):
+        # keeps the last good frame (and its file's mtime, so a restart still
+        # sees it as stale); retried after `retry` seconds, not every rerun
+        self._store(frames, ticker, frames.get(ticker, pd.DataFrame()), now - self.ttl + self.retry)
+
+    def _refresh(self, stale, frames, now):
+        """Top up `stale` in `frames`; returns the tickers that were actually downloaded."""
+        # Tickers without a stored history need the full range; the rest only
+        # need the bars after their last stored date, batched per start date.
+        refreshed = []
+        full = [t for t in stale if frames.get(t) is None or len(frames[t]) < 2]
+        by_start = {}
+        for t in stale:
+            if t not in full:
+                by_start.setdefault(frames[t].index[-2], []).append(t)
+
+        for start, group in by_start.items():
+            deltas = download_history(group, start=start)
+            for t in group:
+                delta = deltas.get(t)
+                if _adjustment_changed(frames[t], delta):
+                    full.append(t)
+                    continue
+                if delta is None or delta.empty:
+                    # a real delta always holds the overlap bar: the download failed
+                    self._retry_later(frames, t, now)
+                    continue
+                self._store(frames, t, merge_delta(frames[t], delta), now)
+                save_history(t, frames[t])
+                refreshed.append(t)
+
+        if full:
+            downloaded = download_history(full, "max")
+            for t in full:
+                frame = downloaded.get(t)
+                if frame is not None and not frame.empty:
+                    save_history(t, frame)
+                    self._store(frames, t, frame, now)
+                    refreshed.append(t)
+                else:
+                    # failed download or unknown symbol
+                    self._retry_later(frames, t, now)
+        return refreshed
+
+    def _refresh_shared(self, stale, frames, now):
+        # With a shared cache (app_shared) only one worker process downloads a
+        # ticker; the others pick up its frame and keep a copy on local disk.
+        def fetch(missing):
+            # only real downloads are published; failures stay local and retry
+            return {t: (frames[t], now) for t in self._refresh(missing, frames, now)}
+
+        for t, (frame, fetched_at) in get_shared_cache().get_or_fetch_many("history", stale, fetch, self.ttl).items():
+            if frames.get(t) is not frame:
+                save_history(t, frame)
+                self._store(frames, t, frame, fetched_at)
+
+    def get_many(self, tickers):
+        """Full histories for tickers; stale or missing ones are topped up in batches."""
+        with self._lock:
+            entries = self._lookup(tickers)
+            frames = {t: frame for t, (frame, _) in entries.items()}
+            now = time.time()
+            stale = [t for t in dict.fromkeys(tickers) if t not in entries or now - entries[t][1] >= self.ttl]
+            # tickers another thread is already downloading are waited for, not fetched twice
+            waits = {self._inflight[t] for t in stale if t in self._inflight}
+            waited = [t for t in stale if t in self._inflight]
+            mine = [t for t in stale if t not in self._inflight]
+            done = threading.Event()
+            for t in mine:
+                self._inflight[t] = done
+        try:
+            if mine:
+                self._refresh_shared(mine, frames, now)
+        finally:
+            with self._lock:
+                for t in mine:
+                    self._inflight.pop(t, None)
+            done.set()
+        if waited:
+            for event in waits:
+                event.wait()
+            with self._lock:
+                frames.update({t: frame for t, (frame, _) in self._lookup(waited).items()})
+        return {t: frames.get(t, pd.DataFrame()) for t in tickers}
+
+    def peek(self, tickers):
+        """Stored histories for tickers as they are now; never downloads (see get_many)."""
+        with self._lock:
+            entries = self._lookup(tickers)
+        return {t: entries[t][0] if t in entries else pd.DataFrame() for t in tickers}
+
+
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+
+def slice_period(hist, period: str):
+    """The tail of a full history covering `period` (one of PERIOD_OFFSETS)."""
+    if hist is None or hist.empty:
+        return pd.DataFrame()
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return hist
+    return hist[hist.index >= hist.index[-1] - offset]
+
+
+def daily_change(hist):
+    """(change, pct) between the last two closes, or None with fewer than two bars."""
+    if hist is None or len(hist) < 2:
+        return None
+    last, prev = hist["Close"].iloc[-1], hist["Close"].iloc[-2]
+    if not prev:
+        return None
+    change = last - prev
+    return change, (change / prev) * 100
@@ -0,0 +1,162 @@
+# app_indicators.py
+# Technical indicators (SMA / EMA 20-50-200, RSI, Bollinger bands) kept per
+# ticker next to its history. The recursive ones (EMA, RSI's Wilder averages)
+# carry their last state in the stored frame, so when the history store adds
+# bars only the tail is recomputed, seeded from that state.
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_cache import CACHE_DIR, LRUCache, read_feather, safe_name, write_feather
+
+INDICATOR_DIR = CACHE_DIR / "indicators"
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (20, 50, 200)
+RSI_PERIOD = 14
+BB_WINDOW = 20
+BB_STD = 2.0
+
+# The history store's delta refresh re-downloads from the second-to-last
+# stored bar, so that many trailing bars are recomputed on every update
+REVISE_BARS = 2
+
+# Sidebar choices -> the columns they draw ("Volume" is the history's own)
+INDICATORS = {
+    "SMA 20": ["SMA 20"], "SMA 50": ["SMA 50"], "SMA 200": ["SMA 200"],
+    "EMA 20": ["EMA 20"], "EMA 50": ["EMA 50"], "EMA 200": ["EMA 200"],
+    "Bollinger": ["BB Upper", "BB Lower"], "RSI": ["RSI"], "Volume": [],
+}
+# Drawn in their own panel below the price
+PANEL_INDICATORS = ("Volume", "RSI")
+
+
+def indicator_columns(selected):
+    return [c for name in selected for c in INDICATORS.get(name, [])]
+
+
+# ----------------------------------------------------------------------
+# Vectorized computation over close[start:], seeded from the row before it
+# ----------------------------------------------------------------------
+def _rolling_mean(close, start: int, window: int):
+    lo = max(0, start - window + 1)
+    csum = np.concatenate(([0.0], np.cumsum(close[lo:])))
+    out = np.full(len(close) - start, np.nan)
+    ends = np.arange(max(start, window - 1), len(close))  # windows ending here are complete
+    out[ends - start] = (csum[ends - lo + 1] - csum[ends - lo + 1 - window]) / window
+    return out
+
+
+def _rolling_std(close, start: int, window: int):
+    lo = max(0, start - window + 1)
+    out = np.full(len(close) - start, np.nan)
+    if len(close) - lo >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(close[lo:], window)
+        first = max(start, window - 1)
+        out[first - start:] = windows[first - window + 1 - lo:].std(axis=1)
+    return out
+
+
+def _ewm(values, alpha: float, seed=None):
+    # pandas' adjust=False recursion; prepending the previous value continues it exactly
+    if seed is not None:
+        values = np.concatenate(([seed], values))
+    out = pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out[1:] if seed is not None else out
+
+
+def compute_indicators(close, start: int = 0, prev=None):
+    """Indicator columns for close[start:]; `prev` is the stored row at start - 1."""
+    tail = close[start:]
+    cols = {}
+    for w in SMA_WINDOWS:
+        cols[f"SMA {w}"] = _rolling_mean(close, start, w)
+    for span in EMA_SPANS:
+        cols[f"EMA {span}"] = _ewm(tail, 2.0 / (span + 1), None if prev is None else prev[f"EMA {span}"])
+
+    mid = cols[f"SMA {BB_WINDOW}"] if BB_WINDOW in SMA_WINDOWS else _rolling_mean(close, start, BB_WINDOW)
+    band = BB_STD * _rolling_std(close, start, BB_WINDOW)
+    cols["BB Upper"], cols["BB Lower"] = mid + band, mid - band
+
+    diff = np.diff(close[start - 1:] if start else close, prepend=np.nan if start else close[0])
+    diff = diff[-len(tail):]
+    alpha = 1.0 / RSI_PERIOD
+    gain = _ewm(np.clip(diff, 0, None), alpha, None if prev is None else prev["_gain"])
+    loss = _ewm(np.clip(-diff, 0, None), alpha, None if prev is None else prev["_loss"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), 100.0)
+    rsi[np.arange(start, len(close)) < RSI_PERIOD] = np.nan
+    cols["RSI"] = rsi
+    cols["_gain"], cols["_loss"], cols["_close"] = gain, loss, tail
+    return cols
+
+
+def update_indicators(prev, hist):
+    """
+    Indicators for `hist`, reusing `prev` (an earlier result) wherever the
+    history hasn't changed. Returns `prev` itself when there is nothing new.
+    """
+    close = hist["Close"].to_numpy(dtype=np.float64)
+    n = len(close)
+    start = 0
+    if prev is not None and len(prev) and n and hist.index[0] == prev.index[0]:
+        if len(prev) == n and prev.index[-1] == hist.index[-1] and prev["_close"].iat[-1] == close[-1]:
+            return prev
+        # resume after the last bar that can't have been revised, if it still matches
+        k = min(len(prev), n) - REVISE_BARS
+        if k > 0 and prev.index[k - 1] == hist.index[k - 1] and np.isclose(prev["_close"].iat[k - 1], close[k - 1]):
+            start = k
+    seed = prev.iloc[start - 1] if start else None
+    tail = pd.DataFrame(compute_indicators(close, start, seed), index=hist.index[start:])
+    return pd.concat([prev.iloc[:start], tail]) if start else tail
+
+
+# ----------------------------------------------------------------------
+# Disk cache (beside the history files)
+# ----------------------------------------------------------------------
+def _indicator_path(ticker: str):
+    return INDICATOR_DIR / f"{safe_name(ticker)}.feather"
+
+
+def load_indicators(ticker: str):
+    return read_feather(_indicator_path(ticker))
+
+
+def save_indicators(ticker: str, frame):
+    write_feather(_indicator_path(ticker), frame)
+
+
+class IndicatorStore:
+    def __init__(self, max_entries: int = 1024):
+        self._frames = LRUCache(max_entries=max_entries, name="indicators")
+        self._lock = threading.Lock()
+
+    def get(self, ticker: str, hist):
+        """Indicator frame aligned with `hist` (the ticker's full history)."""
+        if hist is None or hist.empty:
+            return pd.DataFrame(index=getattr(hist, "index", None))
+        with self._lock:
+            cached = self._frames.get(ticker)
+            prev = cached if cached is not None else load_indicators(ticker)
+            frame = update_indicators(prev, hist)
+            if frame is not prev:
+                save_indicators(ticker, frame)
+            if frame is not cached:
+                self._frames.put(ticker, frame)
+            return frame
+
+
+@st.cache_resource
+def get_indicator_store():
+    return IndicatorStore()
+
+
+def with_indicators(hist, full_ind, selected):
+    """`hist` (a tail slice of the full history) plus the selected indicator columns."""
+    cols = indicator_columns(selected)
+    if not cols or hist.empty:
+        return hist
+    n = len(hist)
+    return hist.assign(**{c: full_ind[c].to_numpy()[-n:] for c in cols})
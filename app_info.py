@@ -0,0 +1,142 @@
+# app_info.py
+# Company info in two tiers. The static tier (names, sector, summary, website,
+# share count, 52-week range) comes from the heavy get_info() call, projected
+# to the fields a card uses and kept on disk for a day. The live tier (price,
+# market cap) comes from yfinance's fast_info on a short TTL.
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+from app_cache import CACHE_DIR, LRUCache, safe_name
+from app_perf import timed
+from app_shared import get_shared_cache
+
+INFO_DIR = CACHE_DIR / "info"
+
+STATIC_INFO_TTL = 86400
+LIVE_INFO_TTL = 60
+
+# A failed get_info() is retried after this long rather than on every rerun
+INFO_RETRY = 600
+
+# Everything the card reads from get_info(); the other few hundred fields are dropped
+STATIC_FIELDS = (
+    "shortName", "longName", "sector", "industry", "website", "logo_url",
+    "longBusinessSummary", "sharesOutstanding", "fiftyTwoWeekHigh", "fiftyTwoWeekLow",
+)
+
+# info key -> fast_info attribute
+LIVE_FIELDS = {"currentPrice": "last_price", "previousClose": "previous_close", "marketCap": "market_cap"}
+
+
+def project_info(info: dict):
+    return {k: info[k] for k in STATIC_FIELDS if info.get(k) not in (None, "")}
+
+
+# ----------------------------------------------------------------------
+# Providers
+# ----------------------------------------------------------------------
+@timed("provider:info")
+def download_static_info(ticker: str):
+    import yfinance as yf
+    return project_info(yf.Ticker(ticker).get_info() or {})
+
+
+@timed("provider:fast_info")
+def download_live_info(ticker: str):
+    """Price / previous close / market cap from fast_info, under their get_info() names."""
+    import yfinance as yf
+    fast = yf.Ticker(ticker).fast_info
+    live = {}
+    for field, attr in LIVE_FIELDS.items():
+        try:
+            value = getattr(fast, attr)
+        except Exception:
+            continue
+        if value:
+            live[field] = float(value)
+    return live
+
+
+# ----------------------------------------------------------------------
+# Disk cache
+# ----------------------------------------------------------------------
+def _info_path(ticker: str):
+    return INFO_DIR / f"{safe_name(ticker)}.json"
+
+
+def load_info(ticker: str):
+    """(info, mtime) from the disk cache, or (None, 0) when nothing usable is stored."""
+    path = _info_path(ticker)
+    try:
+        return json.loads(path.read_text()), path.stat().st_mtime
+    except Exception:
+        return None, 0
+
+
+def save_info(ticker: str, info: dict):
+    path = _info_path(ticker)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(info))
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Static tier store
+# ----------------------------------------------------------------------
+class InfoStore:
+    def __init__(self, ttl: int = STATIC_INFO_TTL, retry: int = INFO_RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        self._entries = LRUCache(max_entries=4096, name="info")  # ticker -> (info, fetched_at)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _ticker_lock(self, ticker: str):
+        # per-ticker, so the fetch stage's pool still downloads in parallel
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def get(self, ticker: str):
+        """Projected static info; re-fetched once older than ttl, last good copy kept on failure."""
+        with self._ticker_lock(ticker):
+            entry = self._entries.get(ticker)
+            if entry is None:
+                info, mtime = load_info(ticker)
+                if info is not None:
+                    entry = (info, mtime)
+                    self._entries.put(ticker, entry)
+            now = time.time()
+            if entry is not None and now - entry[1] < self.ttl:
+                return entry[0]
+
+            def fetch():
+                try:
+                    info = download_static_info(ticker)
+                except Exception:
+                    return None
+                return (info, now) if info else None
+
+            # another worker process may have fetched it already (app_shared)
+            fetched = get_shared_cache().get_or_fetch("info", ticker, fetch, self.ttl)
+            if fetched is not None:
+                info, fetched_at = fetched
+                save_info(ticker, info)
+                self._entries.put(ticker, (info, fetched_at))
+                return info
+            # keep the last good copy; retry after `retry` seconds, not every rerun
+            info = entry[0] if entry is not None else {}
+            self._entries.put(ticker, (info, now - self.ttl + self.retry))
+            return info
+
+
+@st.cache_resource
+def get_info_store():
+    return InfoStore()
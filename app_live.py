@@ -0,0 +1,157 @@
+# app_live.py
+# Timer-driven fragments for each ticker card. Every block reruns on its own
+# schedule (st.fragment(run_every=...)), so an auto-refresh recomputes a few
+# quote numbers instead of re-executing the whole script.
+import inspect
+
+import streamlit as st
+
+from app_data import get_company_news, get_live_quote
+from app_history import get_history_store, slice_period
+from app_indicators import get_indicator_store, with_indicators
+from app_overview import compare_matrix
+from app_poller import current_session_id, get_quote_poller
+from app_render import COMPARE_BASE, DEFAULT_BACKEND, card_html, news_html, render_chart, render_comparison
+
+# Slower schedules for the heavy sections; their data changes far less often
+CHART_REFRESH = 900
+NEWS_REFRESH = 1800
+
+
+def _fragment(func, run_every):
+    # Fragment identity comes from the function's qualname and its position on
+    # the page, so re-wrapping each run keeps the same fragment alive.
+    return st.fragment(func, run_every=run_every)
+
+
+# ----------------------------------------------------------------------
+# Lazy sections: a body only runs while its expander is open
+# ----------------------------------------------------------------------
+try:
+    _STATEFUL_EXPANDER = "on_change" in inspect.signature(st.expander).parameters
+except (TypeError, ValueError):
+    _STATEFUL_EXPANDER = False
+
+
+def lazy_section(label: str, key: str, expanded: bool = False):
+    """
+    (container, is_open) for a collapsible card section.
+
+    Newer Streamlit reports the expander's open state (key + on_change="rerun"),
+    so a collapsed section costs nothing on the server; older versions get a
+    keyed toggle standing in for it. Either way the state lives in
+    session_state under `key` and survives reruns.
+    """
+    if _STATEFUL_EXPANDER:
+        box = st.expander(label, expanded=expanded, key=key, on_change="rerun")
+        return box, bool(box.open)
+    is_open = st.toggle(label, value=expanded, key=key)
+    return st.container(), is_open
+
+
+# ----------------------------------------------------------------------
+# Shared quote poller subscription
+# ----------------------------------------------------------------------
+def _subscribe(session_id: str, tickers, refresh_rate: int):
+    get_quote_poller().subscribe(session_id, tickers, refresh_rate)
+
+
+def watch_quotes(tickers, refresh_rate: int):
+    """Register this session's watchlist with the poller and keep it registered."""
+    _fragment(_subscribe, refresh_rate)(current_session_id(), tuple(tickers), refresh_rate)
+
+
+# ----------------------------------------------------------------------
+# Card: header + price / cap / range / daily change as one HTML block
+# ----------------------------------------------------------------------
+def card_metrics(ticker: str, info: dict, change):
+    """[(label, value, delta)] for card_html(), from the poller's latest quote."""
+    # reads the poller's latest snapshot; never waits on the network
+    quote = get_live_quote(ticker)
+
+    price = quote.get("price") or info.get("currentPrice") or info.get("regularMarketPrice")
+    cap = info.get("marketCap")
+    shares = info.get("sharesOutstanding")
+    if quote.get("price") and shares:
+        cap = quote["price"] * shares
+    high = info.get("fiftyTwoWeekHigh")
+    low = info.get("fiftyTwoWeekLow")
+    # the range is refreshed daily; a new high or low today shows up right away
+    if price and high and low:
+        high, low = max(high, round(price, 2)), min(low, round(price, 2))
+
+    prev = quote.get("previous_close")
+    if quote.get("price") and prev:
+        delta = quote["price"] - prev
+        change = (delta, (delta / prev) * 100)
+
+    metrics = [
+        ("Current Price", f"${price:,.2f}" if price else "N/A", None),
+        ("Market Cap", f"${cap:,.0f}" if cap else "N/A", None),
+        ("52w High / Low", f"${high} / ${low}", None),
+    ]
+    if change is not None:
+        change, pct = change
+        metrics.append(("Daily Change", f"${change:.2f}", (f"{pct:.2f}%", pct >= 0)))
+    return metrics
+
+
+def _card_block(ticker: str, info: dict, change, logo_src, separator: bool):
+    st.markdown(card_html(ticker, info, card_metrics(ticker, info, change), logo_src, separator),
+                unsafe_allow_html=True)
+
+
+def live_card(ticker: str, info: dict, change, refresh_rate: int, logo_src: str = None, separator: bool = False):
+    """The card's header and metrics, re-rendered every `refresh_rate` seconds."""
+    _fragment(_card_block, refresh_rate)(ticker, info, change, logo_src, separator)
+
+
+# ----------------------------------------------------------------------
+# Chart
+# ----------------------------------------------------------------------
+def _chart_block(ticker: str, period: str, bg_image, bg_key, backend: str, indicators):
+    # read-only: the quote poller tops up every watched history in one batch
+    full = get_history_store().peek([ticker])[ticker]
+    hist = slice_period(full, period)
+    if hist.empty:
+        return
+    if indicators:
+        # kept per ticker and only extended when the history gains bars
+        hist = with_indicators(hist, get_indicator_store().get(ticker, full), indicators)
+    render_chart(backend, hist, ticker, bg_image, period, bg_key, indicators)
+
+
+def live_chart(ticker: str, period: str, bg_image, bg_key, backend: str = DEFAULT_BACKEND, indicators=()):
+    _fragment(_chart_block, CHART_REFRESH)(ticker, period, bg_image, bg_key, backend, tuple(indicators))
+
+
+# ----------------------------------------------------------------------
+# Comparison: every ticker rebased and aligned in one figure
+# ----------------------------------------------------------------------
+def _comparison_block(tickers, period: str, bg_image, bg_key, backend: str, grid: bool):
+    # the whole watchlist, refreshed (when stale) in one batched download
+    histories = get_history_store().get_many(tickers)
+    wide = compare_matrix({t: slice_period(h, period) for t, h in histories.items()}, base=COMPARE_BASE)
+    if wide.empty:
+        st.warning("No data available to compare.")
+        return
+    render_comparison(backend, wide, bg_image, period, bg_key, grid)
+
+
+def live_comparison(tickers, period: str, bg_image, bg_key, backend: str = DEFAULT_BACKEND, grid: bool = False):
+    _fragment(_comparison_block, CHART_REFRESH)(tuple(tickers), period, bg_image, bg_key, backend, grid)
+
+
+# ----------------------------------------------------------------------
+# News
+# ----------------------------------------------------------------------
+def _news_block(ticker: str, api_key: str):
+    news = get_company_news(ticker, api_key)
+    if news:
+        st.markdown(news_html(news[:5]), unsafe_allow_html=True)
+    else:
+        st.info("No recent news available.")
+
+
+def live_news(ticker: str, api_key: str):
+    _fragment(_news_block, NEWS_REFRESH)(ticker, api_key)
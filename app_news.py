@@ -0,0 +1,160 @@
+# app_news.py
+# Finnhub company-news client: pooled connections, a per-key token bucket for
+# the per-minute quota, jittered backoff on 429 and incremental date windows.
+import datetime
+import os
+import random
+import threading
+import time
+
+import streamlit as st
+
+from app_assets import http_session
+from app_cache import LRUCache
+from app_perf import span
+from app_shared import get_shared_cache
+
+# Overridable so the client can be pointed at a local mock server
+FINNHUB_BASE_URL = os.environ.get("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")
+
+NEWS_TTL = 1800
+NEWS_WINDOW_DAYS = 30
+MAX_ARTICLES = 50
+
+# Finnhub's free tier allows 60 calls/minute per key
+RATE_PER_MINUTE = 60
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+REQUEST_TIMEOUT = 10
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per `per` seconds, bursts up to `rate`."""
+
+    def __init__(self, rate: int, per: float = 60.0):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+def _article_key(article: dict):
+    return article.get("id") or article.get("url")
+
+
+def merge_articles(existing, fresh, limit: int = MAX_ARTICLES):
+    """Newest-first union of two article lists, deduplicated by Finnhub id."""
+    merged = {}
+    for article in list(existing) + list(fresh):
+        key = _article_key(article)
+        if key is not None:
+            merged[key] = article
+    articles = sorted(merged.values(), key=lambda a: a.get("datetime", 0), reverse=True)
+    return articles[:limit]
+
+
+class NewsClient:
+    def __init__(self, base_url: str = FINNHUB_BASE_URL, session=None, rate_per_minute: int = RATE_PER_MINUTE,
+                 ttl: int = NEWS_TTL, max_retries: int = MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or http_session()
+        self.rate_per_minute = rate_per_minute
+        self.ttl = ttl
+        self.max_retries = max_retries
+        # News is shared data: state is per symbol (articles, fetched_at) under
+        # the shared memory budget, only the quota is per key
+        self._state = LRUCache(max_entries=2048, name="news")
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, api_key: str):
+        with self._lock:
+            if api_key not in self._buckets:
+                self._buckets[api_key] = TokenBucket(self.rate_per_minute)
+            return self._buckets[api_key]
+
+    def _request(self, params: dict, api_key: str):
+        bucket = self._bucket(api_key)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            with span("provider:news"):
+                response = self.session.get(f"{self.base_url}/company-news", params={**params, "token": api_key},
+                                            timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                data = response.json()
+                return data if isinstance(data, list) else []
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            try:
+                # never sooner than the server allows: jitter only upwards
+                delay = float(response.headers.get("Retry-After")) * random.uniform(1.0, 1.5)
+            except (TypeError, ValueError):
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            time.sleep(delay)
+        if response.status_code == 429:
+            raise RateLimited(params.get("symbol"))
+        raise RuntimeError(f"Finnhub returned HTTP {response.status_code}")
+
+    def _window_start(self, articles, today):
+        # after the first load, only ask for days from the newest article seen
+        oldest = today - datetime.timedelta(days=NEWS_WINDOW_DAYS)
+        if not articles:
+            return oldest
+        newest = datetime.datetime.fromtimestamp(articles[0].get("datetime", 0), datetime.timezone.utc).date()
+        return max(oldest, newest)
+
+    def get_news(self, symbol: str, api_key: str):
+        """Newest-first articles for `symbol`; refreshed incrementally once older than ttl."""
+        if not api_key:
+            return []
+        symbol = symbol.strip().upper()
+        now = time.time()
+        stored, fetched_at = self._state.get(symbol, ([], 0))
+        if now - fetched_at < self.ttl:
+            return stored
+
+        def fetch():
+            # UTC like the articles' timestamps, so `from` never passes `to`
+            today = datetime.datetime.now(datetime.timezone.utc).date()
+            params = {"symbol": symbol, "from": self._window_start(stored, today).isoformat(),
+                      "to": today.isoformat()}
+            try:
+                fresh = self._request(params, api_key)
+            except Exception:
+                return None
+            fresh = [item for item in fresh if item.get("headline") and item.get("url")]
+            cutoff = now - NEWS_WINDOW_DAYS * 86400
+            with self._lock:
+                current = self._state.get(symbol, ([], 0))[0]
+                return [a for a in merge_articles(current, fresh) if a.get("datetime", 0) >= cutoff], now
+
+        # one worker process fetches for all of them (app_shared)
+        fetched = get_shared_cache().get_or_fetch("news", symbol, fetch, self.ttl)
+        if fetched is None:
+            # keep serving what we have; try again on the next call
+            return stored
+        self._state.put(symbol, fetched)
+        return fetched[0]
+
+
+@st.cache_resource
+def get_news_client():
+    return NewsClient()
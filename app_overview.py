@@ -0,0 +1,101 @@
+# app_overview.py
+# Watchlist overview: last price, daily change, 52-week range and a sparkline
+# for every ticker, computed in one vectorized pass over the batched histories.
+import warnings
+
+import numpy as np
+import pandas as pd
+
+SPARK_POINTS = 60
+OVERVIEW_COLUMNS = ["Ticker", "Last", "Change", "Change %", "52w High", "52w Low", "Trend"]
+
+
+def field_matrix(histories: dict, column: str, rows: int = 300, ffill: bool = True):
+    """
+    Dates x tickers frame of the last `rows` values (all with rows=None) of
+    each history's `column` (its Close when it has no such column). Gaps (a
+    ticker without a bar on some date) are forward-filled unless ffill=False.
+    """
+    closes = {t: h[column] if column in h else h["Close"]
+              for t, h in histories.items() if h is not None and not h.empty}
+    if rows is not None:
+        closes = {t: c.iloc[-rows:] for t, c in closes.items()}
+    if not closes:
+        return pd.DataFrame()
+    # same-calendar histories (the common case) skip concat's index alignment
+    index = next(iter(closes.values())).index
+    if all(c.index.equals(index) for c in closes.values()):
+        wide = pd.DataFrame(np.column_stack([c.to_numpy(dtype=np.float64) for c in closes.values()]),
+                            index=index, columns=list(closes))
+    else:
+        wide = pd.concat(closes, axis=1).sort_index()
+    return wide.ffill() if ffill else wide
+
+
+def close_matrix(histories: dict, rows: int = 300, ffill: bool = True):
+    return field_matrix(histories, "Close", rows, ffill)
+
+
+def last_two(values):
+    """Each column's last two non-NaN values, as (last, prev); NaN where a column has fewer."""
+    rows = np.arange(len(values))[:, None]
+    pos = np.where(np.isnan(values), -1, rows)
+    last_i = pos.max(axis=0)
+    prev_i = np.where(pos < last_i, pos, -1).max(axis=0)
+    cols = np.arange(values.shape[1])
+
+    def pick(i):
+        return np.where(i >= 0, values[np.maximum(i, 0), cols], np.nan)
+    return pick(last_i), pick(prev_i)
+
+
+def compare_matrix(histories: dict, base: float = 100.0):
+    """
+    Every history's closes rebased so each series starts at `base`, on one
+    shared date index. A series starts at its own first bar when it has none
+    at the earliest date.
+    """
+    wide = close_matrix(histories, rows=None)
+    if wide.empty:
+        return wide
+    first = wide.bfill().iloc[0].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return wide * np.where(first != 0, base / first, np.nan)
+
+
+def build_overview(histories: dict, spark_points: int = SPARK_POINTS):
+    """One row per ticker (OVERVIEW_COLUMNS), in the order of `histories`."""
+    wide = close_matrix(histories, ffill=False)
+    if wide.empty:
+        return pd.DataFrame(columns=OVERVIEW_COLUMNS)
+
+    # from each ticker's own bars: a ticker with no bar on the latest date
+    # (exchange holiday, lagging feed) keeps its last real change
+    values = wide.to_numpy(dtype=np.float64)
+    last, prev = last_two(values)
+    change = last - prev
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(prev != 0, change / prev * 100, np.nan)
+
+    # intraday extremes, like the card's fiftyTwoWeekHigh / Low
+    highs, lows = field_matrix(histories, "High", ffill=False), field_matrix(histories, "Low", ffill=False)
+    year_start = wide.index[-1] - pd.DateOffset(years=1)
+    with warnings.catch_warnings():
+        # tickers with no bars in the last year come out as NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        high = np.nanmax(highs.to_numpy(dtype=np.float64)[highs.index >= year_start], axis=0)
+        low = np.nanmin(lows.to_numpy(dtype=np.float64)[lows.index >= year_start], axis=0)
+    spark = wide.ffill().iloc[-spark_points:].bfill().to_numpy(dtype=np.float64).T
+
+    overview = pd.DataFrame({
+        "Ticker": wide.columns,
+        "Last": last,
+        "Change": change,
+        "Change %": pct,
+        "52w High": high,
+        "52w Low": low,
+        "Trend": [row.tolist() for row in spark],
+    })
+    present = set(wide.columns)
+    order = [t for t in histories if t in present]
+    return overview.set_index("Ticker").loc[order].reset_index()
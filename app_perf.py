@@ -0,0 +1,151 @@
+# app_perf.py
+# Opt-in timing spans, plus the in-memory caches' own hit / miss / byte
+# stats. While disabled, span() hands back one shared no-op context manager,
+# so instrumented code pays a single flag check.
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+import streamlit as st
+
+from app_cache import cache_stats
+
+_enabled = os.environ.get("CYBERPUNK_PERF", "") not in ("", "0")
+_noop = nullcontext()
+_lock = threading.Lock()
+_spans = {}   # name -> [count, total_s, max_s]
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+
+
+# ----------------------------------------------------------------------
+# Spans
+# ----------------------------------------------------------------------
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_span(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def record_span(name: str, seconds: float):
+    with _lock:
+        stat = _spans.get(name)
+        if stat is None:
+            _spans[name] = [1, seconds, seconds]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+
+
+def span(name: str):
+    """`with span("stage"):` times the block when instrumentation is on."""
+    return _Span(name) if _enabled else _noop
+
+
+def timed(name: str):
+    """Decorator form of span() for provider calls."""
+    def deco(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+def snapshot():
+    with _lock:
+        spans = {name: {"count": c, "total_s": round(t, 6), "mean_s": round(t / c, 6), "max_s": round(m, 6)}
+                 for name, (c, t, m) in _spans.items()}
+    # the in-memory caches keep their own counters, always on
+    return {"enabled": _enabled, "spans": spans, "memory": cache_stats()}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2, sort_keys=True)
+
+
+def to_prometheus(prefix: str = "cyberpunk"):
+    snap = snapshot()
+    lines = [f"# TYPE {prefix}_stage_seconds summary"]
+    for name, s in sorted(snap["spans"].items()):
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s["total_s"]}')
+    lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+    for name, s in sorted(snap["spans"].items()):
+        lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {s["max_s"]}')
+    memory = {name: m for name, m in snap["memory"].items() if not name.startswith("_")}
+    lines.append(f"# TYPE {prefix}_memory_cache_bytes gauge")
+    for name, m in sorted(memory.items()):
+        lines.append(f'{prefix}_memory_cache_bytes{{cache="{name}"}} {m["bytes"]}')
+    lines.append(f"# TYPE {prefix}_memory_budget_bytes gauge")
+    lines.append(f'{prefix}_memory_budget_bytes {snap["memory"]["_budget"]["max_bytes"]}')
+    lines.append(f"# TYPE {prefix}_memory_cache_total counter")
+    for name, m in sorted(memory.items()):
+        for event in ("hits", "misses", "evictions"):
+            lines.append(f'{prefix}_memory_cache_total{{cache="{name}",event="{event}"}} {m[event]}')
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Sidebar panel (shown only with ?perf=1 or CYBERPUNK_PERF set)
+# ----------------------------------------------------------------------
+def panel_requested():
+    try:
+        return _enabled or st.query_params.get("perf") not in (None, "", "0")
+    except Exception:
+        return _enabled
+
+
+def _on_perf_toggle():
+    enable(st.session_state["perf_enabled"])
+
+
+def render_perf_panel(container):
+    with container:
+        with st.expander("🩺 Performance diagnostics"):
+            # recording is process-wide: only an actual click changes it, so
+            # sessions showing different checkbox states don't fight over it
+            st.checkbox("Record timings", value=_enabled, key="perf_enabled", on_change=_on_perf_toggle)
+            snap = snapshot()
+            if snap["spans"]:
+                rows = sorted(snap["spans"].items(), key=lambda kv: kv[1]["total_s"], reverse=True)
+                st.dataframe([{"stage": k, **v} for k, v in rows], hide_index=True)
+            budget = snap["memory"].pop("_budget")
+            st.caption(f"Memory caches: {budget['bytes'] / 2**20:.1f} of {budget['max_bytes'] / 2**20:.0f} MB")
+            st.dataframe([{"cache": k, **v} for k, v in sorted(snap["memory"].items())], hide_index=True)
+            c1, c2, c3 = st.columns(3)
+            c1.download_button("JSON", to_json(), "perf.json", "application/json")
+            c2.download_button("Prometheus", to_prometheus(), "perf.prom", "text/plain")
+            if c3.button("Reset"):
+                reset()
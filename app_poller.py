@@ -0,0 +1,124 @@
+# app_poller.py
+# One background quote poller per server process. Sessions register their
+# watchlists; the poller fetches the union once per interval and publishes an
+# immutable snapshot that every session reads without blocking. The same
+# union's stored histories are kept current from here, in one batch, so the
+# chart fragments only ever read them.
+import threading
+import time
+
+import streamlit as st
+
+from app_history import daily_change, download_history, get_history_store
+from app_perf import timed
+
+# Fastest allowed poll; the slider in run_app() starts here too
+MIN_POLL_INTERVAL = 10
+DEFAULT_POLL_INTERVAL = 60
+
+# A session that hasn't re-subscribed for this long no longer counts
+SUBSCRIPTION_TTL = 600
+
+
+@timed("provider:quotes")
+def fetch_quotes(symbols):
+    """{symbol: quote} for all symbols from one batched short-range download."""
+    quotes = {}
+    now = time.time()
+    for symbol, frame in download_history(symbols, "5d").items():
+        if frame.empty:
+            continue
+        quote = {"price": float(frame["Close"].iloc[-1]), "as_of": now}
+        change = daily_change(frame)
+        if change is not None:
+            quote["previous_close"] = quote["price"] - float(change[0])
+        quotes[symbol] = quote
+    return quotes
+
+
+def refresh_histories(symbols):
+    # HistoryStore only downloads the stale ones, batched per start date
+    get_history_store().get_many(symbols)
+
+
+class QuotePoller(threading.Thread):
+    def __init__(self, fetch=fetch_quotes, refresh=refresh_histories):
+        super().__init__(name="quote-poller", daemon=True)
+        self._fetch = fetch
+        self._refresh = refresh
+        self._subscriptions = {}  # session_id -> (symbols, interval, last_seen)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self.snapshot = {}
+        self.polls = 0
+
+    def subscribe(self, session_id: str, symbols, interval: int = DEFAULT_POLL_INTERVAL):
+        symbols = frozenset(symbols)
+        with self._lock:
+            self._subscriptions[session_id] = (symbols, max(MIN_POLL_INTERVAL, interval), time.time())
+        if not symbols <= self.snapshot.keys():
+            self._wake.set()
+
+    def unsubscribe(self, session_id: str):
+        with self._lock:
+            self._subscriptions.pop(session_id, None)
+
+    def get(self, symbol: str):
+        return self.snapshot.get(symbol, {})
+
+    def _active(self):
+        # union of live subscriptions and the fastest interval any of them asked for
+        now = time.time()
+        with self._lock:
+            for sid, (_, _, seen) in list(self._subscriptions.items()):
+                if now - seen > SUBSCRIPTION_TTL:
+                    del self._subscriptions[sid]
+            subs = list(self._subscriptions.values())
+        symbols = set().union(*(s for s, _, _ in subs)) if subs else set()
+        interval = min((i for _, i, _ in subs), default=DEFAULT_POLL_INTERVAL)
+        return symbols, interval
+
+    def poll_once(self):
+        symbols, interval = self._active()
+        if symbols:
+            try:
+                fresh = self._fetch(sorted(symbols))
+            except Exception:
+                fresh = {}
+            # keep the last good quote for symbols that failed this round
+            snapshot = {s: q for s, q in self.snapshot.items() if s in symbols}
+            snapshot.update(fresh)
+            self.snapshot = snapshot
+            self.polls += 1
+            try:
+                self._refresh(sorted(symbols))
+            except Exception:
+                pass
+        return interval
+
+    def run(self):
+        while not self._stopped.is_set():
+            interval = self.poll_once()
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+
+@st.cache_resource
+def get_quote_poller():
+    poller = QuotePoller()
+    poller.start()
+    return poller
+
+
+def current_session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx is not None else "default"
+    except Exception:
+        return "default"
@@ -1,46 +1,212 @@
 # app_render.py
 # Rendering helpers extracted from original app_core_2.py
-import streamlit as st
+import datetime
+import threading
+from html import escape
 from io import BytesIO
-from PIL import Image
-import matplotlib.pyplot as plt
-try:
-    import mplcyberpunk
-except Exception:
-    mplcyberpunk = None
-import plotly.graph_objects as go
-import requests
-
-def render_company_header(info: dict, ticker: str):
-    # safe logo retrieval
-    logo_url = info.get("logo_url")
-    if not logo_url:
-        domain = info.get("website", "").replace("https://", "").replace("http://", "").split("/")[0]
-        if domain:
-            logo_url = f"https://logo.clearbit.com/{domain}"
-
-    cols = st.columns([1, 4])
-    col_logo, col_meta = cols[0], cols[1]
-    with col_logo:
-        if logo_url:
-            try:
-                r = requests.get(logo_url, timeout=5)
-                if r.status_code == 200:
-                    st.image(Image.open(BytesIO(r.content)), width=100)
-            except Exception:
-                pass
-    with col_meta:
-        st.markdown(f"### {info.get('shortName', ticker)}")
-        st.caption(f"{info.get('sector', 'N/A')} | {info.get('industry', 'N/A')}")
 
-def render_matplotlib_cyberpunk_chart(hist, ticker, bg_image):
+import numpy as np
+import streamlit as st
+
+from app_cache import LRUCache
+from app_downsample import POINTS_PER_PIXEL, downsample_history, downsample_matrix
+from app_indicators import PANEL_INDICATORS, REVISE_BARS, indicator_columns
+from app_perf import timed
+
+# ----------------------------------------------------------------------
+# Ticker card: header, metrics and separator as one HTML block, so a card
+# is a single element instead of a dozen (classes styled in app_core).
+# "$" goes out as an entity, or st.markdown would typeset prices as LaTeX.
+# ----------------------------------------------------------------------
+def card_html(ticker: str, info: dict, metrics, logo_src: str = None, separator: bool = False):
+    """metrics: [(label, value, (delta_text, positive) or None)]"""
+    logo = f"<img class='cp-logo' src='{escape(logo_src)}' alt=''>" if logo_src else ""
+    cells = []
+    for label, value, delta in metrics:
+        delta_html = ""
+        if delta is not None:
+            text, positive = delta
+            delta_html = f"<div class='cp-delta {'cp-up' if positive else 'cp-down'}'>{'▲' if positive else '▼'} {text}</div>"
+        cells.append(f"<div class='cp-metric'><div class='cp-metric-label'>{escape(label)}</div>"
+                     f"<div class='cp-metric-value'>{escape(value)}</div>{delta_html}</div>")
+    return (f"{'<hr class=cp-sep>' if separator else ''}"
+            f"<div class='cp-card'><div class='cp-head'>{logo}<div>"
+            f"<h3>{escape(str(info.get('shortName', ticker)))}</h3>"
+            f"<div class='cp-sub'>{escape(str(info.get('sector', 'N/A')))} | {escape(str(info.get('industry', 'N/A')))}</div>"
+            f"</div></div><div class='cp-metrics'>{''.join(cells)}</div></div>").replace("$", "&#36;")
+
+
+def news_html(articles):
+    """News cards for `articles` as one HTML block."""
+    items = []
+    for article in articles:
+        when = datetime.datetime.fromtimestamp(article.get("datetime", 0)).strftime("%b %d, %Y")
+        items.append(f"<div class='news-card'><a href='{escape(str(article.get('url')))}' target='_blank'>"
+                     f"<b>{escape(str(article.get('headline')))}</b></a><br>"
+                     f"<small>{escape(str(article.get('source', 'Unknown')))} | {when}</small></div>")
+    return "".join(items).replace("$", "&#36;")
+
+
+# ----------------------------------------------------------------------
+# Chart backends. Each one imports its plotting library on first use, so a
+# session only pays for the backend it actually draws with.
+# ----------------------------------------------------------------------
+CHART_BACKENDS = {}  # name -> (render, load)
+DEFAULT_BACKEND = "matplotlib"
+FALLBACK_BACKEND = "plotly"
+
+
+def chart_backend(name: str, load):
+    """Register render(hist, ticker, bg_image, period, bg_key, indicators=()) -> bool under `name`."""
+    def deco(render):
+        CHART_BACKENDS[name] = (render, load)
+        return render
+    return deco
+
+
+def load_backend(name: str):
+    """Import a backend's libraries ahead of time (startup report, warm-up)."""
+    return CHART_BACKENDS[name][1]()
+
+
+def render_chart(backend: str, hist, ticker, bg_image=None, period="", bg_key=None, indicators=()):
+    """
+    Draw with `backend`; the fallback backend takes over if it fails.
+    `indicators` are app_indicators.INDICATORS names whose columns `hist` carries.
+    """
+    render = CHART_BACKENDS.get(backend, CHART_BACKENDS[DEFAULT_BACKEND])[0]
+    if render(hist, ticker, bg_image, period, bg_key, indicators=indicators):
+        return True
+    if backend == FALLBACK_BACKEND:
+        return False
+    return CHART_BACKENDS[FALLBACK_BACKEND][0](hist, ticker, bg_image, period, bg_key, indicators=indicators)
+
+
+# Comparison renderers, one per chart backend: the whole watchlist in one figure
+COMPARE_BACKENDS = {}  # chart backend name -> render
+COMPARE_BASE = 100.0  # every series is rebased to start here
+
+# Small multiples: panels per row, and each row's height (inches / plotly px)
+COMPARE_GRID_COLS = 3
+COMPARE_ROW_INCHES = 2.2
+COMPARE_ROW_PX = 200
+
+
+def comparison_backend(name: str):
+    """Register render(wide, bg_image, period, bg_key, grid=False) -> bool for chart backend `name`."""
+    def deco(render):
+        COMPARE_BACKENDS[name] = render
+        return render
+    return deco
+
+
+def render_comparison(backend: str, wide, bg_image=None, period="", bg_key=None, grid=False):
+    """
+    Draw app_overview.compare_matrix() output as overlaid lines, or one small
+    panel per ticker with `grid`. Falls back like render_chart().
+    """
+    render = COMPARE_BACKENDS.get(backend, COMPARE_BACKENDS[DEFAULT_BACKEND])
+    if render(wide, bg_image, period, bg_key, grid=grid):
+        return True
+    if backend == FALLBACK_BACKEND:
+        return False
+    return COMPARE_BACKENDS[FALLBACK_BACKEND](wide, bg_image, period, bg_key, grid=grid)
+
+
+def tail_token(frame, rows: int = REVISE_BARS):
+    """
+    The last `rows` rows as bytes: the bars the history store's delta refresh
+    rewrites in place, so a revised intraday close changes the cache key.
+    """
+    return frame.iloc[-rows:].to_numpy(dtype=np.float64).tobytes()
+
+
+def comparison_cache_key(wide, period, bg_key, figsize=None, grid=False):
+    return ("compare", tuple(wide.columns), period, wide.index[-1], len(wide), tail_token(wide), bg_key,
+            tuple(figsize or ()), grid)
+
+
+def _grid_shape(n: int):
+    cols = min(COMPARE_GRID_COLS, n)
+    return -(-n // cols), cols
+
+
+def _chart_panels(hist, indicators):
+    # indicators drawn below the price, in PANEL_INDICATORS order
+    return [p for p in PANEL_INDICATORS if p in indicators and p in hist]
+
+
+def _overlay_columns(hist, indicators):
+    return [c for c in indicator_columns(i for i in indicators if i not in PANEL_INDICATORS) if c in hist]
+
+
+# ----------------------------------------------------------------------
+# Matplotlib cyberpunk chart, cached as PNG bytes
+# ----------------------------------------------------------------------
+CHART_FIGSIZE = (10, 5)
+CHART_DPI = 150  # keep app_assets.BACKGROUND_SIZE in step
+
+# Shared by every session; keyed by chart_cache_key()
+_chart_cache = LRUCache(max_entries=256, max_bytes=64 * 1024 * 1024, name="charts")
+
+# pyplot keeps global state (rcParams, current figure), so draw one chart at a time
+_mpl_lock = threading.Lock()
+
+
+def _load_matplotlib():
+    import matplotlib.pyplot as plt
+    try:
+        import mplcyberpunk
+    except Exception:
+        mplcyberpunk = None
+    return plt, mplcyberpunk
+
+
+def chart_cache_key(hist, ticker, period, bg_key, figsize=CHART_FIGSIZE, indicators=()):
+    return (ticker, period, hist.index[-1], len(hist), tail_token(hist), bg_key, tuple(figsize), tuple(indicators))
+
+
+def _date_formatter():
+    from matplotlib.dates import DateFormatter
+    import sys
+    if sys.platform.startswith('win'):
+        return DateFormatter('%m/%d/%y')
+    return DateFormatter('%-m/%-d/%y')
+
+
+def _draw_matplotlib_panels(axes, hist, panels):
+    for pax, panel in zip(axes, panels):
+        pax.set_facecolor('none')
+        pax.grid(True, color='white', alpha=0.25)
+        if panel == "Volume":
+            pax.fill_between(hist.index, 0, hist['Volume'], step='mid', alpha=0.5, linewidth=0)
+            pax.set_ylabel("Volume")
+        elif panel == "RSI":
+            pax.plot(hist.index, hist['RSI'], linewidth=1)
+            pax.axhline(70, color='white', alpha=0.4, linestyle='--', linewidth=0.8)
+            pax.axhline(30, color='white', alpha=0.4, linestyle='--', linewidth=0.8)
+            pax.set_ylim(0, 100)
+            pax.set_ylabel("RSI")
+
+
+@timed("render:matplotlib_draw")
+def _draw_matplotlib_chart(hist, ticker, bg_image, figsize, indicators=()):
+    hist = downsample_history(hist, int(figsize[0] * CHART_DPI))
+    plt, mplcyberpunk = _load_matplotlib()
     try:
         if mplcyberpunk is not None:
             plt.style.use("cyberpunk")
     except Exception:
         pass
+    panels = _chart_panels(hist, indicators)
+    if panels:
+        fig, axes = plt.subplots(1 + len(panels), 1, figsize=figsize, sharex=True,
+                                 gridspec_kw={"height_ratios": [3] + [1] * len(panels)})
+        ax = axes[0]
+    else:
+        fig, ax = plt.subplots(figsize=figsize)
+        axes = [ax]
     try:
-        fig, ax = plt.subplots(figsize=(10, 5))
         fig.patch.set_alpha(0)
         ax.set_facecolor('none')
         if bg_image is not None:
@@ -51,37 +217,351 @@ def render_matplotlib_cyberpunk_chart(hist, ticker, bg_image):
             except Exception:
                 pass
         ax.plot(hist.index, hist['Close'], label=ticker, linewidth=2, zorder=2)
-        from matplotlib.dates import DateFormatter
-        import sys
-        if sys.platform.startswith('win'):
-            ax.xaxis.set_major_formatter(DateFormatter('%m/%d/%y'))
-        else:
-            ax.xaxis.set_major_formatter(DateFormatter('%-m/%-d/%y'))
+        overlays = _overlay_columns(hist, indicators)
+        if "BB Upper" in overlays and "BB Lower" in overlays:
+            ax.fill_between(hist.index, hist['BB Lower'], hist['BB Upper'], alpha=0.12, linewidth=0, zorder=1)
+        for col in overlays:
+            ax.plot(hist.index, hist[col], label=col, linewidth=1, alpha=0.9, zorder=2)
+        if overlays:
+            ax.legend(loc='upper left', fontsize=8)
+        _draw_matplotlib_panels(axes[1:], hist, panels)
+        axes[-1].xaxis.set_major_formatter(_date_formatter())
         ax.grid(True, color='white', alpha=0.25)
         ax.set_title(f"{ticker} Stock Price", fontsize=14)
-        ax.set_xlabel("Date")
+        axes[-1].set_xlabel("Date")
         ax.set_ylabel("Price ($)")
         try:
             if mplcyberpunk is not None:
-                mplcyberpunk.add_glow_effects()
+                mplcyberpunk.add_glow_effects(ax)
         except Exception:
             pass
-        st.pyplot(fig)
+        buf = BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight", dpi=CHART_DPI)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+@chart_backend("matplotlib", _load_matplotlib)
+def render_matplotlib_cyberpunk_chart(hist, ticker, bg_image, period="", bg_key=None,
+                                      figsize=CHART_FIGSIZE, indicators=()):
+    # bg_key identifies bg_image (path or content hash); charts are re-drawn only
+    # when the data, period, background, size or indicators actually change
+    try:
+        key = chart_cache_key(hist, ticker, period, bg_key if bg_image is not None else None, figsize, indicators)
+        png = _chart_cache.get(key)
+        if png is None:
+            with _mpl_lock:
+                png = _draw_matplotlib_chart(hist, ticker, bg_image, figsize, indicators)
+            _chart_cache.put(key, png)
+        st.image(png, use_container_width=True)
         return True
     except Exception:
         return False
 
-def render_plotly_fallback(hist, ticker):
-    fig = go.Figure(data=[go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name=ticker)])
-    fig.update_layout(template='plotly_dark', margin=dict(l=0, r=0, t=30, b=0), height=320,
+
+@timed("render:matplotlib_compare")
+def _draw_matplotlib_comparison(wide, bg_image, figsize, grid=False):
+    wide = downsample_matrix(wide, int(figsize[0] * CHART_DPI))
+    plt, mplcyberpunk = _load_matplotlib()
+    try:
+        if mplcyberpunk is not None:
+            plt.style.use("cyberpunk")
+    except Exception:
+        pass
+    n = len(wide.columns)
+    if grid:
+        rows, cols = _grid_shape(n)
+        fig, axes = plt.subplots(rows, cols, figsize=(figsize[0], COMPARE_ROW_INCHES * rows),
+                                 sharex=True, sharey=True, squeeze=False)
+        axes = list(axes.ravel())
+    else:
+        fig, ax = plt.subplots(figsize=figsize)
+        axes = [ax]
+    try:
+        fig.patch.set_alpha(0)
+        for ax in axes[n:]:
+            ax.set_visible(False)
+        used = axes[:n] if grid else axes
+        # a background behind every small multiple would drown them out
+        if bg_image is not None and not grid:
+            try:
+                axes[0].imshow(bg_image, extent=[wide.index.min(), wide.index.max(),
+                                                 np.nanmin(wide.to_numpy()), np.nanmax(wide.to_numpy())],
+                               aspect='auto', alpha=1.0, zorder=0)
+            except Exception:
+                pass
+        for i, ticker in enumerate(wide.columns):
+            ax = axes[i] if grid else axes[0]
+            ax.plot(wide.index, wide[ticker], label=ticker, color=f"C{i}", linewidth=1.5 if grid else 2, zorder=2)
+            if grid:
+                ax.set_title(ticker, fontsize=10)
+        for ax in used:
+            ax.set_facecolor('none')
+            ax.grid(True, color='white', alpha=0.25)
+            ax.axhline(COMPARE_BASE, color='white', alpha=0.4, linestyle='--', linewidth=0.8)
+            ax.xaxis.set_major_formatter(_date_formatter())
+        if grid:
+            for ax in used:
+                ax.tick_params(labelsize=8)
+            fig.autofmt_xdate()
+        else:
+            axes[0].legend(loc='upper left', fontsize=8, ncol=min(n, 4))
+            axes[0].set_title("Performance (rebased to 100)", fontsize=14)
+            axes[0].set_xlabel("Date")
+            axes[0].set_ylabel("Rebased close")
+        try:
+            if mplcyberpunk is not None:
+                for ax in used:
+                    mplcyberpunk.make_lines_glow(ax)
+        except Exception:
+            pass
+        buf = BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight", dpi=CHART_DPI)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+@comparison_backend("matplotlib")
+def render_matplotlib_comparison(wide, bg_image=None, period="", bg_key=None, grid=False,
+                                 figsize=CHART_FIGSIZE):
+    # one figure, one glow pass and one PNG for the whole watchlist
+    try:
+        key = comparison_cache_key(wide, period, bg_key if bg_image is not None and not grid else None,
+                                   figsize, grid)
+        png = _chart_cache.get(key)
+        if png is None:
+            with _mpl_lock:
+                png = _draw_matplotlib_comparison(wide, bg_image, figsize, grid)
+            _chart_cache.put(key, png)
+        st.image(png, use_container_width=True)
+        return True
+    except Exception:
+        return False
+
+
+# Plotly charts stretch to the container; budget points for a wide desktop column
+PLOTLY_WIDTH_PX = 1400
+
+
+PLOTLY_PANEL_HEIGHT = 110
+
+
+def _load_plotly():
+    import plotly.graph_objects as go
+    return go
+
+
+def epoch_ms(index):
+    """Epoch milliseconds of a DatetimeIndex as float64, whatever unit it is stored in."""
+    return index.as_unit("ms").asi8.astype(np.float64)
+
+
+def _plotly_figure(hist, ticker, indicators=(), webgl=False):
+    go = _load_plotly()
+    panels = _chart_panels(hist, indicators)
+    if webgl:
+        # typed arrays on the wire: epoch-ms dates (float64, since plotly.js
+        # typed arrays stop at 32-bit ints) and float32 values. pandas may
+        # store the index in ns or us, so the unit is pinned first.
+        trace = go.Scattergl
+        x = epoch_ms(hist.index)
+
+        def y(col):
+            return hist[col].to_numpy(dtype=np.float32)
+    else:
+        trace = go.Scatter
+        x = hist.index
+
+        def y(col):
+            return hist[col]
+    if panels:
+        from plotly.subplots import make_subplots
+        fig = make_subplots(rows=1 + len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                            row_heights=[3] + [1] * len(panels))
+    else:
+        fig = go.Figure()
+    fig.add_trace(trace(x=x, y=y('Close'), mode='lines', name=ticker))
+
+    overlays = _overlay_columns(hist, indicators)
+    for col in overlays:
+        # the lower band fills up to the upper one drawn just before it
+        fill = 'tonexty' if col == "BB Lower" and "BB Upper" in overlays else None
+        fig.add_trace(trace(x=x, y=y(col), mode='lines', name=col, line=dict(width=1),
+                            fill=fill, fillcolor='rgba(0,234,255,0.08)' if fill else None))
+    for row, panel in enumerate(panels, start=2):
+        if panel == "Volume":
+            fig.add_trace(trace(x=x, y=y('Volume'), mode='lines', name="Volume",
+                            fill='tozeroy', line=dict(width=0)), row=row, col=1)
+        elif panel == "RSI":
+            fig.add_trace(trace(x=x, y=y('RSI'), mode='lines', name="RSI",
+                            line=dict(width=1)), row=row, col=1)
+            for level in (30, 70):
+                fig.add_hline(y=level, line=dict(color='rgba(255,255,255,0.4)', dash='dash', width=1),
+                              row=row, col=1)
+            fig.update_yaxes(range=[0, 100], row=row, col=1)
+    return fig, len(panels)
+
+
+def _plotly_comparison_figure(wide, grid=False, webgl=False):
+    go = _load_plotly()
+    if webgl:
+        trace = go.Scattergl
+        x = epoch_ms(wide.index)
+    else:
+        trace = go.Scatter
+        x = wide.index
+    rows, cols = _grid_shape(len(wide.columns)) if grid else (1, 1)
+    if grid:
+        from plotly.subplots import make_subplots
+        fig = make_subplots(rows=rows, cols=cols, shared_xaxes=True, shared_yaxes=True,
+                            subplot_titles=[str(t) for t in wide.columns],
+                            vertical_spacing=0.08 / rows, horizontal_spacing=0.03)
+    else:
+        fig = go.Figure()
+    for i, ticker in enumerate(wide.columns):
+        y = wide[ticker].to_numpy(dtype=np.float32) if webgl else wide[ticker]
+        cell = dict(row=i // cols + 1, col=i % cols + 1) if grid else {}
+        fig.add_trace(trace(x=x, y=y, mode='lines', name=str(ticker), showlegend=not grid), **cell)
+    fig.add_hline(y=COMPARE_BASE, line=dict(color='rgba(255,255,255,0.4)', dash='dash', width=1),
+                  **(dict(row='all', col='all') if grid else {}))
+    return fig, rows
+
+
+def _comparison_height(rows, grid):
+    return COMPARE_ROW_PX * rows + 40 if grid else 420
+
+
+def _style_plotly_dark(fig, height, showlegend):
+    fig.update_layout(template='plotly_dark', margin=dict(l=0, r=0, t=30, b=0),
+                      height=height, showlegend=showlegend,
                       paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
     fig.update_xaxes(showgrid=True, gridcolor='rgba(255,255,255,0.3)', zeroline=False, showline=True,
                      linecolor='rgba(255,255,255,0.6)', ticks='outside', tickformat='%m/%d/%y')
     fig.update_yaxes(showgrid=True, gridcolor='rgba(255,255,255,0.3)', zeroline=False, showline=True,
                      linecolor='rgba(255,255,255,0.6)')
-    st.markdown("""
-    <style>
-    .plotly-graph-div, .js-plotly-plot svg, .js-plotly-plot .svg-container { background: transparent !important; }
-    </style>
-    """, unsafe_allow_html=True)
+
+
+@timed("render:plotly")
+def render_plotly_fallback(hist, ticker, indicators=()):
+    hist = downsample_history(hist, PLOTLY_WIDTH_PX)
+    fig, n_panels = _plotly_figure(hist, ticker, indicators)
+    _style_plotly_dark(fig, 320 + PLOTLY_PANEL_HEIGHT * n_panels, len(fig.data) > 1)
     st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+
+@chart_backend("plotly", _load_plotly)
+def _render_plotly(hist, ticker, bg_image=None, period="", bg_key=None, indicators=()):
+    try:
+        render_plotly_fallback(hist, ticker, indicators)
+        return True
+    except Exception:
+        return False
+
+
+@comparison_backend("plotly")
+@timed("render:plotly_compare")
+def render_plotly_comparison(wide, bg_image=None, period="", bg_key=None, grid=False):
+    try:
+        fig, rows = _plotly_comparison_figure(downsample_matrix(wide, PLOTLY_WIDTH_PX), grid)
+        _style_plotly_dark(fig, _comparison_height(rows, grid), not grid)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        return True
+    except Exception:
+        return False
+
+
+# ----------------------------------------------------------------------
+# WebGL plotly engine: drawn in the browser from typed-array series with one
+# slim template shared by every chart (plotly_dark alone is ~7 KB per figure)
+# ----------------------------------------------------------------------
+WEBGL_MAX_POINTS = 20000
+_webgl_figures = LRUCache(max_entries=64, name="webgl_figures")
+_webgl_template = None
+
+
+def webgl_template():
+    global _webgl_template
+    if _webgl_template is None:
+        go = _load_plotly()
+        axis = dict(showgrid=True, gridcolor='rgba(255,255,255,0.3)', zeroline=False, showline=True,
+                    linecolor='rgba(255,255,255,0.6)')
+        _webgl_template = go.layout.Template(layout=dict(
+            font=dict(color='#e0f7ff'),
+            colorway=['#00eaff', '#ff2fd6', '#f5d300', '#08f7fe', '#fe53bb', '#00ff41', '#ff9100'],
+            paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(l=0, r=0, t=30, b=0), hovermode='x unified',
+            xaxis=dict(axis, type='date', ticks='outside', tickformat='%m/%d/%y'), yaxis=axis,
+        ))
+    return _webgl_template
+
+
+@timed("render:plotly_webgl")
+def build_webgl_figure(hist, ticker, indicators=()):
+    if len(hist) > WEBGL_MAX_POINTS:
+        hist = downsample_history(hist, int(WEBGL_MAX_POINTS / POINTS_PER_PIXEL))
+    fig, n_panels = _plotly_figure(hist, ticker, indicators, webgl=True)
+    fig.update_layout(template=webgl_template(), height=320 + PLOTLY_PANEL_HEIGHT * n_panels,
+                      showlegend=len(fig.data) > 1)
+    return fig
+
+
+@chart_backend("plotly-webgl", _load_plotly)
+def render_plotly_webgl(hist, ticker, bg_image=None, period="", bg_key=None, indicators=()):
+    # the figure is built once per data / period / indicator change and reused
+    try:
+        key = chart_cache_key(hist, ticker, period, None, (), indicators)
+        fig = _webgl_figures.get(key)
+        if fig is None:
+            fig = build_webgl_figure(hist, ticker, indicators)
+            _webgl_figures.put(key, fig)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        return True
+    except Exception:
+        return False
+
+
+@comparison_backend("plotly-webgl")
+def render_plotly_webgl_comparison(wide, bg_image=None, period="", bg_key=None, grid=False):
+    try:
+        key = comparison_cache_key(wide, period, None, None, grid)
+        fig = _webgl_figures.get(key)
+        if fig is None:
+            if len(wide) > WEBGL_MAX_POINTS:
+                wide = downsample_matrix(wide, int(WEBGL_MAX_POINTS / POINTS_PER_PIXEL))
+            fig, rows = _plotly_comparison_figure(wide, grid, webgl=True)
+            fig.update_layout(template=webgl_template(), height=_comparison_height(rows, grid), showlegend=not grid)
+            _webgl_figures.put(key, fig)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        return True
+    except Exception:
+        return False
+
+
+# ----------------------------------------------------------------------
+# Watchlist overview table
+# ----------------------------------------------------------------------
+def render_overview_table(overview, key: str = "overview"):
+    """Sortable overview of the whole watchlist; returns the tickers whose rows are selected."""
+    event = st.dataframe(
+        overview,
+        key=key,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        column_config={
+            "Last": st.column_config.NumberColumn(format="$%.2f"),
+            "Change": st.column_config.NumberColumn(format="$%.2f"),
+            "Change %": st.column_config.NumberColumn(format="%.2f%%"),
+            "52w High": st.column_config.NumberColumn(format="$%.2f"),
+            "52w Low": st.column_config.NumberColumn(format="$%.2f"),
+            "Trend": st.column_config.LineChartColumn("Trend (60d)"),
+        },
+    )
+    try:
+        rows = event.selection.rows
+    except Exception:
+        rows = []
+    return [overview.iloc[i]["Ticker"] for i in rows]
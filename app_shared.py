@@ -0,0 +1,217 @@
+# app_shared.py
+# Optional cache shared by every Streamlit worker process, so N replicas fetch
+# each history / info / news payload once instead of N times. A per-key lock
+# makes the fetch single-flight: one process downloads, the rest wait for it
+# and read the result. Configured with CYBERPUNK_SHARED_CACHE:
+#
+#   sqlite:///path/to/shared.db   one file for the processes on a host
+#   sqlite://                     same, at CACHE_DIR/shared.db
+#   redis://host:6379/0           a Redis-protocol server (needs the redis package)
+#
+# Unset, every process keeps to its own caches.
+import contextlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+from app_cache import CACHE_DIR
+
+SHARED_CACHE_URL = os.environ.get("CYBERPUNK_SHARED_CACHE", "")
+NAMESPACE = "cyberpunk"
+
+# A lock whose holder died is taken over after LOCK_TTL; a waiter gives up
+# after LOCK_WAIT and fetches on its own
+LOCK_TTL = 120
+LOCK_WAIT = 60
+LOCK_POLL = 0.05
+
+# Expired rows are swept from the SQLite file every this many writes
+SQLITE_SWEEP_EVERY = 200
+
+
+# ----------------------------------------------------------------------
+# Backends: bytes in, bytes out, plus a lock primitive
+# ----------------------------------------------------------------------
+class SQLiteBackend:
+    def __init__(self, path):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT, expires_at REAL)")
+
+    def _conn(self):
+        # sqlite3 connections stay on the thread that made them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ? AND expires_at > ?",
+                                   (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, now + ttl))
+        self._writes += 1
+        if self._writes % SQLITE_SWEEP_EVERY == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def acquire(self, key: str, token: str, ttl: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+        return conn.execute("INSERT OR IGNORE INTO locks VALUES (?, ?, ?)",
+                            (key, token, now + ttl)).rowcount == 1
+
+    def release(self, key: str, token: str):
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisBackend:
+    # only the holder's token may delete a lock
+    _RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        import redis  # optional; only needed for redis:// URLs
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def acquire(self, key: str, token: str, ttl: float):
+        return bool(self.client.set(f"lock:{key}", token, nx=True, ex=max(1, int(ttl))))
+
+    def release(self, key: str, token: str):
+        self.client.eval(self._RELEASE, 1, f"lock:{key}", token)
+
+
+def backend_from_url(url: str):
+    if not url:
+        return None
+    if url.startswith("sqlite://"):
+        return SQLiteBackend(url[len("sqlite://"):] or CACHE_DIR / "shared.db")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported shared cache URL: {url}")
+
+
+# ----------------------------------------------------------------------
+# Shared cache: pickled values, single-flight fetches
+# ----------------------------------------------------------------------
+class SharedCache:
+    """
+    get_or_fetch*() over a backend; with backend=None they just call fetch.
+
+    Backend errors count as misses, so an unreachable server degrades to
+    per-process fetching instead of failing the page.
+    """
+
+    def __init__(self, backend=None, namespace: str = NAMESPACE):
+        self.backend = backend
+        self.namespace = namespace
+
+    def _key(self, prefix: str, name: str):
+        return f"{self.namespace}:{prefix}:{name}"
+
+    def _get(self, key: str):
+        try:
+            raw = self.backend.get(key)
+            return pickle.loads(raw) if raw is not None else None
+        except Exception:
+            return None
+
+    def _set(self, key: str, value, ttl: float):
+        try:
+            self.backend.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+        except Exception:
+            pass
+
+    @contextlib.contextmanager
+    def _locked(self, keys):
+        token = uuid.uuid4().hex
+        held = []
+        try:
+            # sorted, so two processes locking overlapping batches can't deadlock
+            for key in sorted(keys):
+                deadline = time.monotonic() + LOCK_WAIT
+                while True:
+                    try:
+                        if self.backend.acquire(key, token, LOCK_TTL):
+                            held.append(key)
+                            break
+                    except Exception:
+                        break
+                    if time.monotonic() > deadline:
+                        break
+                    time.sleep(LOCK_POLL)
+            yield
+        finally:
+            for key in held:
+                try:
+                    self.backend.release(key, token)
+                except Exception:
+                    pass
+
+    def get_or_fetch_many(self, prefix: str, names, fetch, ttl: float):
+        """
+        {name: value} for names. fetch(missing) -> {name: value} runs only for
+        names no other process has published, while holding their locks; what
+        it returns is published for `ttl` seconds (leave failures out of it).
+        """
+        names = list(dict.fromkeys(names))
+        if self.backend is None:
+            return fetch(names) if names else {}
+        keys = {name: self._key(prefix, name) for name in names}
+        found = {}
+        for name, key in keys.items():
+            value = self._get(key)
+            if value is not None:
+                found[name] = value
+        missing = [n for n in names if n not in found]
+        if not missing:
+            return found
+        with self._locked(keys[n] for n in missing):
+            # whoever held the lock before us may have published these meanwhile
+            for name in missing:
+                value = self._get(keys[name])
+                if value is not None:
+                    found[name] = value
+            missing = [n for n in missing if n not in found]
+            if missing:
+                fresh = fetch(missing)
+                for name, value in fresh.items():
+                    if value is not None:
+                        self._set(keys[name], value, ttl)
+                found.update(fresh)
+        return found
+
+    def get_or_fetch(self, prefix: str, name: str, fetch, ttl: float):
+        """Single-key get_or_fetch_many(); fetch() returns the value, or None to publish nothing."""
+        return self.get_or_fetch_many(prefix, [name], lambda _: {name: fetch()}, ttl).get(name)
+
+
+@st.cache_resource
+def get_shared_cache():
+    try:
+        return SharedCache(backend_from_url(SHARED_CACHE_URL))
+    except Exception:
+        # misconfigured or missing driver: run unshared rather than not at all
+        return SharedCache()
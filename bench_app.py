@@ -0,0 +1,381 @@
+# bench_app.py
+# Offline benchmark for the full dashboard render pipeline.
+#
+# Runs app_core.py headlessly (streamlit.testing AppTest) against fake
+# providers that replay recorded history / info / news payloads, so numbers
+# are comparable between commits and never depend on live yfinance/Finnhub.
+#
+#   python bench_app.py                         # default sweep -> bench_results/<commit>.json
+#   python bench_app.py --sizes 1 10 --periods 1y --backends plotly
+#   python bench_app.py --record AAPL MSFT NVDA # capture live payloads into bench_fixtures/
+#   python bench_app.py --compare old.json new.json
+#   python bench_app.py --startup --budget-ms 400  # import-time report, non-zero exit over budget
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent
+FIXTURES = ROOT / "bench_fixtures"
+RESULTS = ROOT / "bench_results"
+
+DEFAULT_SIZES = [1, 10, 50, 200]
+DEFAULT_PERIODS = ["1y", "max"]
+BACKENDS = ["matplotlib", "plotly", "plotly-webgl"]
+
+# Imported by a first script run (app_core module + run_app()'s imports)
+STARTUP_IMPORTS = ["app_core", "app_render", "app_assets", "app_data", "app_history",
+                   "app_overview", "app_live", "app_perf"]
+# Libraries that should only load once something actually needs them
+DEFERRED_MODULES = ["matplotlib", "mplcyberpunk", "plotly", "yfinance", "requests"]
+
+SYNTHETIC_BARS = 10000
+BENCH_API_KEY = "bench-key"
+
+# The largest "Cards per page" option in app_core.py (checked after the cold run)
+PAGE_SIZE = 50
+
+
+# ----------------------------------------------------------------------
+# Recorded / synthetic payloads
+# ----------------------------------------------------------------------
+def recorded_tickers():
+    return sorted(p.stem for p in (FIXTURES / "history").glob("*.feather"))
+
+
+def watchlist(size: int):
+    """Recorded tickers first, padded with deterministic synthetic symbols."""
+    tickers = recorded_tickers()[:size]
+    tickers += [f"SYN{i:03d}" for i in range(size - len(tickers))]
+    return tickers
+
+
+def _seed(ticker: str):
+    return zlib.crc32(ticker.encode())
+
+
+def load_history_payload(ticker: str):
+    import numpy as np
+    import pandas as pd
+    import pyarrow.feather as feather
+
+    path = FIXTURES / "history" / f"{ticker}.feather"
+    if path.exists():
+        return feather.read_table(path).to_pandas().set_index("Date")
+    rng = np.random.default_rng(_seed(ticker))
+    idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=SYNTHETIC_BARS)
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, SYNTHETIC_BARS)))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.integers(1e5, 1e7, SYNTHETIC_BARS)}, index=idx)
+
+
+def load_info_payload(ticker: str):
+    path = FIXTURES / "info" / f"{ticker}.json"
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"shortName": f"{ticker} Corp", "sector": "Technology", "industry": "Software",
+            "website": f"https://{ticker.lower()}.example.com", "currentPrice": 100.0,
+            "marketCap": 1.5e11, "sharesOutstanding": 1.5e9, "fiftyTwoWeekHigh": 120.0,
+            "fiftyTwoWeekLow": 80.0, "longBusinessSummary": f"{ticker} makes things. " * 40}
+
+
+def load_news_payload(ticker: str):
+    path = FIXTURES / "news" / f"{ticker}.json"
+    if path.exists():
+        return json.loads(path.read_text())
+    now = int(time.time())
+    return [{"id": _seed(ticker) + i, "headline": f"{ticker} headline {i}", "url": f"https://news.example.com/{ticker}/{i}",
+             "datetime": now - i * 3600, "source": "Bench Wire", "summary": ""} for i in range(20)]
+
+
+def record(tickers, api_key: str = ""):
+    """Capture live payloads for tickers into bench_fixtures/."""
+    import pyarrow.feather as feather
+    import requests
+    import yfinance as yf
+
+    for sub in ("history", "info", "news"):
+        (FIXTURES / sub).mkdir(parents=True, exist_ok=True)
+    for ticker in tickers:
+        hist = yf.Ticker(ticker).history(period="max", auto_adjust=True)
+        hist.index = hist.index.tz_localize(None)
+        hist.index.name = "Date"
+        feather.write_feather(hist.reset_index(), FIXTURES / "history" / f"{ticker}.feather")
+        (FIXTURES / "info" / f"{ticker}.json").write_text(json.dumps(yf.Ticker(ticker).get_info(), default=str))
+        if api_key:
+            r = requests.get("https://finnhub.io/api/v1/company-news", timeout=10,
+                             params={"symbol": ticker, "from": "2000-01-01", "to": "2100-01-01", "token": api_key})
+            (FIXTURES / "news" / f"{ticker}.json").write_text(json.dumps(r.json()[:50] if r.ok else []))
+        print(f"recorded {ticker}")
+
+
+# ----------------------------------------------------------------------
+# Fake providers (installed inside the per-case subprocess)
+# ----------------------------------------------------------------------
+def install_fakes():
+    import pandas as pd
+    import requests
+    import yfinance as yf
+    from unittest import mock
+
+    histories = {}
+
+    def history(ticker):
+        if ticker not in histories:
+            histories[ticker] = load_history_payload(ticker)
+        return histories[ticker]
+
+    def fake_download(tickers, period=None, start=None, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {}
+        for t in tickers:
+            frame = history(t)
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            elif period == "5d":
+                frame = frame.iloc[-5:]
+            frames[t] = frame
+        return pd.concat(frames, axis=1)
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def get_info(self):
+            return load_info_payload(self.ticker)
+
+        @property
+        def fast_info(self):
+            info = load_info_payload(self.ticker)
+            return SimpleNamespace(last_price=info.get("currentPrice"), previous_close=info.get("previousClose"),
+                                   market_cap=info.get("marketCap"))
+
+        def history(self, period="1mo", **kwargs):
+            return history(self.ticker)
+
+    from PIL import Image
+    buf = BytesIO()
+    Image.new("RGBA", (128, 128), (0, 234, 255, 255)).save(buf, format="PNG")
+    logo_png = buf.getvalue()
+
+    class FakeResponse:
+        def __init__(self, status_code=200, payload=None, content=b""):
+            self.status_code = status_code
+            self._payload = payload
+            self.content = content
+            self.headers = {}
+            self.ok = status_code == 200
+
+        def json(self):
+            return self._payload
+
+    def fake_get(self, url, params=None, **kwargs):
+        if "company-news" in url:
+            return FakeResponse(payload=load_news_payload((params or {}).get("symbol", "")))
+        return FakeResponse(content=logo_png)
+
+    mock.patch.object(yf, "download", fake_download).start()
+    mock.patch.object(yf, "Ticker", FakeTicker).start()
+    mock.patch.object(requests.Session, "get", fake_get).start()
+    mock.patch.object(requests, "get", lambda url, **kw: fake_get(None, url, **kw)).start()
+
+
+# ----------------------------------------------------------------------
+# One case: cold run then warm run of the whole app, in a fresh process
+# ----------------------------------------------------------------------
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _count_elements(at):
+    from streamlit.testing.v1.element_tree import Block
+    return sum(1 for node in at._tree if not isinstance(node, Block))
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    wall = time.perf_counter() - start
+    return {"wall_s": round(wall, 4), "peak_rss_mb": _peak_rss_mb(), "elements": _count_elements(at),
+            "exceptions": [e.message for e in at.exception]}
+
+
+def run_case(size: int, period: str, backend: str):
+    """
+    Cold + warm run of the first page at the largest "Cards per page", then
+    one run per remaining page, so every ticker of the watchlist is rendered.
+    """
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    install_fakes()
+
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "app_core.py"), default_timeout=3600)
+    # seeded before the first run, so the cold run is the very first render
+    # (imports, poller start-up, background decode included)
+    at.session_state["tickers"] = ", ".join(watchlist(size))
+    at.session_state["finnhub_key"] = BENCH_API_KEY
+    at.session_state["period"] = period
+    at.session_state["chart_backend"] = backend
+    at.session_state["page_size"] = page_size = PAGE_SIZE
+
+    cold = _timed_run(at)
+    if max(int(o) for o in at.selectbox(key="page_size").options) != page_size:
+        raise RuntimeError("PAGE_SIZE no longer matches app_core's largest \"Cards per page\"")
+    warm = _timed_run(at)
+    pages = [cold]
+    for page in range(2, -(-size // page_size) + 1):
+        at.number_input(key="page").set_value(page)
+        pages.append(_timed_run(at))
+    all_pages = {"pages": len(pages), "wall_s": round(sum(p["wall_s"] for p in pages), 4),
+                 "elements": sum(p["elements"] for p in pages), "peak_rss_mb": _peak_rss_mb(),
+                 "exceptions": [e for p in pages for e in p["exceptions"]]}
+    return {"size": size, "period": period, "backend": backend, "page_size": page_size,
+            "cold": cold, "warm": warm, "all_pages": all_pages}
+
+
+def _run_case_subprocess(size, period, backend):
+    # fresh process + empty cache and static dirs per case: cold really is
+    # cold, RSS is per case, and no synthetic logos land in the repo's ./static
+    with tempfile.TemporaryDirectory(prefix="bench-cache-") as cache_dir:
+        env = dict(os.environ, CYBERPUNK_CACHE_DIR=cache_dir, CYBERPUNK_STATIC_DIR=os.path.join(cache_dir, "static"))
+        out = subprocess.run([sys.executable, __file__, "--case", json.dumps([size, period, backend])],
+                             env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"size": size, "period": period, "backend": backend, "error": out.stderr[-2000:]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ----------------------------------------------------------------------
+# Startup report: what a fresh interpreter imports before the first paint
+# ----------------------------------------------------------------------
+def _importtime(code: str):
+    """({top-level module: cumulative ms}, stdout) for `code` run under -X importtime."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True)
+    modules = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are indented under their parent
+            modules[name.strip()] = int(cumulative) / 1000
+    return modules, out.stdout
+
+
+def startup_report(backends, budget_ms=None):
+    """Per chart backend: import ms on top of streamlit itself, and which deferred libraries loaded."""
+    probe = f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    framework, stdout = _importtime("import json, sys, streamlit\n" + probe)
+    framework_ms = sum(framework.values())
+    preloaded = set(json.loads(stdout))  # streamlit itself pulls these in
+    ok = True
+    for backend in backends:
+        code = ("import json, sys, streamlit\n"
+                f"import {', '.join(STARTUP_IMPORTS)}\n"
+                f"app_render.load_backend({backend!r})\n" + probe)
+        modules, stdout = _importtime(code)
+        app = {m: ms for m, ms in modules.items() if m not in framework}
+        app_ms = sum(app.values())
+        loaded = [m for m in json.loads(stdout.strip().splitlines()[-1]) if m not in preloaded]
+        over = budget_ms is not None and app_ms > budget_ms
+        ok = ok and not over
+        top = sorted(app.items(), key=lambda kv: kv[1], reverse=True)[:6]
+        print(f"{backend:<10} app imports {app_ms:>7.1f}ms (streamlit {framework_ms:.1f}ms)"
+              f"{'  OVER BUDGET' if over else ''}")
+        print("           deferred loaded: " + (", ".join(loaded) or "none"))
+        print("           top: " + ", ".join(f"{m} {ms:.1f}ms" for m, ms in top))
+    return ok
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def sweep(sizes, periods, backends, out_path=None):
+    commit = _git_commit()
+    results = []
+    for size in sizes:
+        for period in periods:
+            for backend in backends:
+                case = _run_case_subprocess(size, period, backend)
+                results.append(case)
+                if "error" in case:
+                    print(f"{size:>4} {period:>4} {backend:<10} ERROR")
+                else:
+                    print(f"{size:>4} {period:>4} {backend:<10} "
+                          f"cold {case['cold']['wall_s']:>8.3f}s  warm {case['warm']['wall_s']:>8.3f}s  "
+                          f"all {case['all_pages']['pages']:>2}p {case['all_pages']['wall_s']:>8.3f}s  "
+                          f"rss {case['all_pages']['peak_rss_mb']:>7.1f}MB  elements {case['all_pages']['elements']}")
+    report = {"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "platform": platform.platform(), "results": results}
+    out_path = Path(out_path) if out_path else RESULTS / f"{commit}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"wrote {out_path}")
+    return report
+
+
+def compare(old_path, new_path):
+    """Print per-case wall-time ratios (new / old) for two result files."""
+    def index(path):
+        data = json.loads(Path(path).read_text())
+        return data["commit"], {(r["size"], r["period"], r["backend"]): r for r in data["results"] if "error" not in r}
+
+    old_commit, old = index(old_path)
+    new_commit, new = index(new_path)
+    print(f"{old_commit} -> {new_commit}")
+    for key in sorted(old.keys() & new.keys()):
+        parts = []
+        for phase in ("cold", "warm", "all_pages"):
+            if phase not in old[key] or phase not in new[key]:
+                continue  # results from before pagination have no all_pages
+            o, n = old[key][phase]["wall_s"], new[key][phase]["wall_s"]
+            parts.append(f"{phase} {o:.3f}s -> {n:.3f}s (x{n / o if o else float('nan'):.2f})")
+        print(f"{key[0]:>4} {key[1]:>4} {key[2]:<10} " + "  ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the dashboard render pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--periods", nargs="+", default=DEFAULT_PERIODS)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--out", help="result file (default bench_results/<commit>.json)")
+    parser.add_argument("--record", nargs="+", metavar="TICKER", help="capture live payloads and exit")
+    parser.add_argument("--finnhub-key", default=os.environ.get("FINNHUB_API_KEY", ""))
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--startup", action="store_true", help="import-time report per backend and exit")
+    parser.add_argument("--budget-ms", type=float, help="with --startup: fail when app imports exceed this")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(*json.loads(args.case))))
+    elif args.record:
+        record(args.record, args.finnhub_key)
+    elif args.compare:
+        compare(*args.compare)
+    elif args.startup:
+        sys.exit(0 if startup_report(args.backends, args.budget_ms) else 1)
+    else:
+        sweep(args.sizes, args.periods, args.backends, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# tests/test_history.py
+# HistoryStore's delta refresh against a fake download_history
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_history
+from app_history import HistoryStore, load_history
+
+
+def bars(n, end="2026-10-16", start_close=100.0):
+    index = pd.bdate_range(end=end, periods=n)
+    close = start_close + np.arange(n, dtype=np.float64)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": 1000.0}, index=index)
+
+
+class FakeProvider:
+    """download_history stand-in: serves `frames` (full history per ticker) and records each call."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, tickers, period="max", start=None):
+        self.calls.append((tuple(tickers), period if start is None else None, start))
+        if self.fail:
+            return {}
+        return {t: self.frames[t] if start is None else self.frames[t][self.frames[t].index >= start]
+                for t in tickers if t in self.frames}
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_history, "HISTORY_DIR", tmp_path / "history")
+    fake = FakeProvider({"AAA": bars(10)})
+    monkeypatch.setattr(app_history, "download_history", fake)
+    return fake
+
+
+def expire(store, ticker):
+    frame, _ = store._entries.get(ticker)
+    store._entries.put(ticker, (frame, time.time() - store.ttl - 1))
+
+
+def test_first_load_downloads_full_history(provider):
+    store = HistoryStore()
+    frame = store.get_many(["AAA"])["AAA"]
+    assert len(frame) == 10
+    assert provider.calls == [(("AAA",), "max", None)]
+    assert load_history("AAA")[0].equals(frame)
+
+
+def test_delta_appends_new_bars(provider):
+    store = HistoryStore()
+    stored = store.get_many(["AAA"])["AAA"]
+    provider.frames["AAA"] = bars(12, end=stored.index[-1] + pd.offsets.BDay(2))
+    expire(store, "AAA")
+    frame = store.get_many(["AAA"])["AAA"]
+    # one bar of overlap before the last stored one, then only the new bars
+    assert provider.calls[-1] == (("AAA",), None, stored.index[-2])
+    assert len(frame) == 12
+    assert frame["Close"].tolist() == provider.frames["AAA"]["Close"].tolist()
+    assert load_history("AAA")[0].equals(frame)
+
+
+def test_revised_last_bar_replaces_stored_row(provider):
+    store = HistoryStore()
+    stored = store.get_many(["AAA"])["AAA"]
+    revised = stored.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] += 0.5  # intraday close moved
+    provider.frames["AAA"] = revised
+    expire(store, "AAA")
+    frame = store.get_many(["AAA"])["AAA"]
+    assert len(frame) == 10
+    assert frame["Close"].iat[-1] == stored["Close"].iat[-1] + 0.5
+    assert not frame.index.duplicated().any()
+
+
+def test_adjusted_overlap_bar_triggers_full_reload(provider):
+    store = HistoryStore()
+    store.get_many(["AAA"])
+    provider.frames["AAA"] = bars(10, start_close=50.0)  # split: the whole series re-adjusted
+    expire(store, "AAA")
+    frame = store.get_many(["AAA"])["AAA"]
+    assert provider.calls[-1] == (("AAA",), "max", None)
+    assert frame["Close"].tolist() == provider.frames["AAA"]["Close"].tolist()
+    assert load_history("AAA")[0]["Close"].iat[0] == 50.0
+
+
+def test_failed_download_keeps_last_good_frame(provider):
+    store = HistoryStore(retry=300)
+    stored = store.get_many(["AAA"])["AAA"]
+    mtime = load_history("AAA")[1]
+    expire(store, "AAA")
+    provider.fail = True
+    frame = store.get_many(["AAA"])["AAA"]
+    assert frame.equals(stored)
+    assert load_history("AAA")[1] == mtime  # the file doesn't look freshly refreshed
+    # not retried on every call, but due again once the retry window passes
+    calls = len(provider.calls)
+    store.get_many(["AAA"])
+    assert len(provider.calls) == calls
+    _, fetched_at = store._entries.get("AAA")
+    assert time.time() - fetched_at == pytest.approx(store.ttl - store.retry, abs=5)
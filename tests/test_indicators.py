@@ -0,0 +1,44 @@
+# tests/test_indicators.py
+# Incremental indicator updates must match a full recompute
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_indicators import update_indicators
+
+
+def history(n=600, seed=0):
+    index = pd.bdate_range(end="2026-10-16", periods=n)
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def assert_same(incremental, full):
+    pd.testing.assert_frame_equal(incremental, full, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 14, 15, 20, 199, 200, 201, 598, 599])
+def test_incremental_matches_full_recompute(k):
+    h = history()
+    assert_same(update_indicators(update_indicators(None, h[:k]), h), update_indicators(None, h))
+
+
+@pytest.mark.parametrize("k", [3, 30, 250, 599])
+def test_revised_last_bar_matches_full_recompute(k):
+    h = history()
+    # the earlier state saw a different close for what was then the last bar
+    early = h[:k].copy()
+    early.iloc[-1, 0] += 3.0
+    assert_same(update_indicators(update_indicators(None, early), h), update_indicators(None, h))
+
+
+def test_unchanged_history_returns_previous_frame():
+    h = history()
+    prev = update_indicators(None, h)
+    assert update_indicators(prev, h) is prev
+
+
+def test_changed_start_recomputes_everything():
+    h = history()
+    prev = update_indicators(None, h[5:])
+    assert_same(update_indicators(prev, h), update_indicators(None, h))
@@ -0,0 +1,110 @@
+# tests/test_news.py
+# app_news.NewsClient against a local mock Finnhub server
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from app_news import NewsClient, RateLimited
+
+
+class MockFinnhub:
+    """Serves queued (status, articles) replies to /company-news and records each query."""
+
+    def __init__(self):
+        self.replies = []
+        self.queries = []
+        self.retry_after = "0"
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mock.queries.append({k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()})
+                status, body = mock.replies.pop(0) if mock.replies else (200, [])
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", mock.retry_after)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def finnhub():
+    mock = MockFinnhub()
+    yield mock
+    mock.close()
+
+
+def make_client(finnhub, **kwargs):
+    session = requests.Session()
+    session.trust_env = False  # no proxy between us and 127.0.0.1
+    return NewsClient(base_url=finnhub.url, session=session, **kwargs)
+
+
+def article(id_, days_ago):
+    return {"id": id_, "headline": f"h{id_}", "url": f"https://example.com/{id_}",
+            "datetime": int(time.time() - days_ago * 86400)}
+
+
+def test_retries_429_then_succeeds(finnhub):
+    finnhub.replies = [(429, {}), (429, {}), (200, [article(1, 1)])]
+    news = make_client(finnhub).get_news("aapl", "key")
+    assert [a["id"] for a in news] == [1]
+    assert len(finnhub.queries) == 3
+    assert finnhub.queries[0]["symbol"] == "AAPL"
+
+
+def test_retry_after_is_never_shortened(finnhub, monkeypatch):
+    delays = []
+    monkeypatch.setattr("app_news.time.sleep", delays.append)
+    finnhub.retry_after = "2"
+    finnhub.replies = [(429, {})] * 5 + [(200, [article(1, 1)])]
+    assert [a["id"] for a in make_client(finnhub, max_retries=5).get_news("AAPL", "key")] == [1]
+    assert len(delays) == 5 and all(2 <= d <= 3 for d in delays)
+
+
+def test_gives_up_after_max_retries(finnhub):
+    finnhub.replies = [(429, {})] * 3
+    client = make_client(finnhub, max_retries=2)
+    with pytest.raises(RateLimited):
+        client._request({"symbol": "AAPL"}, "key")
+    assert len(finnhub.queries) == 3
+    # get_news swallows it and serves what it has (nothing yet)
+    finnhub.replies = [(429, {})] * 3
+    assert client.get_news("AAPL", "key") == []
+
+
+def test_incremental_window_and_dedupe(finnhub):
+    client = make_client(finnhub, ttl=0)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    finnhub.replies = [(200, [article(1, 3), article(2, 2)])]
+    first = client.get_news("AAPL", "key")
+    assert [a["id"] for a in first] == [2, 1]
+    assert finnhub.queries[0]["from"] == (today - datetime.timedelta(days=30)).isoformat()
+
+    # the refresh only asks from the newest stored article's day; the overlap is deduplicated by id
+    finnhub.replies = [(200, [article(2, 2), article(3, 1)])]
+    second = client.get_news("AAPL", "key")
+    newest = datetime.datetime.fromtimestamp(first[0]["datetime"], datetime.timezone.utc).date()
+    assert finnhub.queries[1]["from"] == newest.isoformat()
+    assert finnhub.queries[1]["from"] <= finnhub.queries[1]["to"]
+    assert [a["id"] for a in second] == [3, 2, 1]
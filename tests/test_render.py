@@ -0,0 +1,32 @@
+# tests/test_render.py
+# WebGL figures carry dates as epoch-ms typed arrays; they must decode back to the bars' dates
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_render import _plotly_comparison_figure, build_webgl_figure
+
+
+def history(unit):
+    index = pd.bdate_range(end="2026-10-16", periods=300).as_unit(unit)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, len(index)))
+    return pd.DataFrame({"Close": close, "Volume": 1000.0}, index=index)
+
+
+def decoded(trace):
+    return pd.to_datetime(np.asarray(trace.x), unit="ms")
+
+
+@pytest.mark.parametrize("unit", ["ns", "us", "ms", "s"])
+def test_webgl_figure_dates_decode(unit):
+    hist = history(unit)
+    fig = build_webgl_figure(hist, "TEST")
+    assert fig.data[0].type == "scattergl"
+    assert (decoded(fig.data[0]) == hist.index.as_unit("ns")).all()
+
+
+@pytest.mark.parametrize("unit", ["ns", "us"])
+def test_webgl_comparison_dates_decode(unit):
+    wide = history(unit)[["Close"]].rename(columns={"Close": "TEST"})
+    fig, _ = _plotly_comparison_figure(wide, webgl=True)
+    assert (decoded(fig.data[0]) == wide.index.as_unit("ns")).all()